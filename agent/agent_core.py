@@ -1,18 +1,520 @@
 """Core agent implementation with agentic loop."""
 
 import asyncio
-import uuid
-from typing import Any, Dict, List, Optional
+import hashlib
+import itertools
+import json
+import os
+import re
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 from agent.ollama_client import OllamaClient
 from agent.context_manager import ContextManager
 from agent.error_recovery import ErrorRecoverySystem
 from agent.tool_executor import ToolExecutor
+from agent import json_utils
 from agent.prompts.system_prompt import get_system_prompt
 
 
+# Tool parameter definitions (optimized for Claude Code-like behavior), read-only
+_TOOL_DEFINITIONS: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    "read_file": {
+        "description": "Read contents of a file. Use the exact file path provided by the user.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string", 
+                    "description": "Path to the file to read (e.g., 'main.py', './config/settings.yaml')"
+                },
+                "offset": {
+                    "type": "integer", 
+                    "description": "Optional: Line number to start reading from (1-indexed)"
+                },
+                "limit": {
+                    "type": "integer", 
+                    "description": "Optional: Maximum number of lines to read"
+                }
+            },
+            "required": ["file_path"]
+        }
+    },
+    "write_file": {
+        "description": "Write content to a file. Creates the file if it doesn't exist.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string", 
+                    "description": "Path to the file to write (e.g., 'output.txt')"
+                },
+                "content": {
+                    "type": "string", 
+                    "description": "Content to write to the file"
+                }
+            },
+            "required": ["file_path", "content"]
+        }
+    },
+    "list_directory": {
+        "description": "List files and directories. IMPORTANT: Use '.' for current directory, not 'home' or other names.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "directory": {
+                    "type": "string", 
+                    "description": "Directory path. Use '.' for current/this directory, '..' for parent, or specify a path like './src'"
+                },
+                "pattern": {
+                    "type": "string", 
+                    "description": "Optional: Glob pattern to filter results (e.g., '*.py', '*.txt')"
+                }
+            },
+            "required": ["directory"]
+        }
+    },
+    "bash": {
+        "description": "Execute a shell command in the current directory",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string", 
+                    "description": "Shell command to execute (e.g., 'ls -la', 'pwd', 'git status')"
+                }
+            },
+            "required": ["command"]
+        }
+    },
+    "grep": {
+        "description": "Search for text patterns in files (like ripgrep). Use '.' to search in current directory.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "pattern": {
+                    "type": "string", 
+                    "description": "Text pattern to search for"
+                },
+                "path": {
+                    "type": "string", 
+                    "description": "Path to search in. Use '.' for current directory (default: '.')"
+                }
+            },
+            "required": ["pattern"]
+        }
+    },
+    "glob": {
+        "description": "Find files matching a pattern. Use '.' to search from current directory.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "pattern": {
+                    "type": "string",
+                    "description": "Glob pattern (e.g., '**/*.py' for all Python files, '*.txt' for text files)"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Base directory to search from. Use '.' for current directory (default: '.')"
+                }
+            },
+            "required": ["pattern"]
+        }
+    },
+    "edit_file": {
+        "description": "Edit a file by replacing text. Use for making changes to existing files.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "Path to the file to edit"
+                },
+                "old_string": {
+                    "type": "string",
+                    "description": "Exact text to find and replace"
+                },
+                "new_string": {
+                    "type": "string",
+                    "description": "New text to replace with"
+                }
+            },
+            "required": ["file_path", "old_string", "new_string"]
+        }
+    }
+})
+
+# System prompts are static, resolve them once at import
+_SYSTEM_PROMPT_MAIN = get_system_prompt("main")
+_SYSTEM_PROMPT_THINK = get_system_prompt("system_think")
+_SYSTEM_PROMPT_PLAN = get_system_prompt("system_plan")
+
+# Static tool-selection instructions; the compact tool catalog rendered by
+# _render_tools_compact() follows them
+_TOOL_PROMPT_DIRECT = """Choose the ONE most appropriate tool and respond ONLY with valid JSON (no extra text):
+
+{
+  "tool": "tool_name",
+  "arguments": {...}
+}
+
+Available tools (arguments ending in ? are optional):
+"""
+
+_TOOL_PROMPT_PLAN = """Choose ONE tool to execute right now. Respond with a JSON object in this format:
+{
+    "tool": "tool_name",
+    "arguments": {
+        "param1": "value1",
+        "param2": "value2"
+    },
+    "reasoning": "why this tool and these arguments"
+}
+
+Available tools (arguments ending in ? are optional):
+"""
+
+
+# Argument lists (optional ones marked ?) for the server's tools that have no
+# Ollama definition above, so the catalog still names their parameters
+_CATALOG_ONLY_ARGS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "find": ("name?", "path?", "file_type?", "max_depth?"),
+    "web_fetch": ("url", "timeout?"),
+    "web_search": ("query", "max_results?"),
+    "get_job_status": ("job_id",),
+    "kill_job": ("job_id",),
+})
+
+
+def _render_tools_compact(tool_names: List[str]) -> str:
+    """
+    Render tool names and argument lists as compact JSON for prompts.
+
+    Args:
+        tool_names: Names of the available tools
+
+    Returns:
+        JSON such as [{"name":"read_file","args":["file_path","offset?","limit?"]}]
+    """
+    tools = []
+    for name in tool_names:
+        entry: Dict[str, Any] = {"name": name}
+        definition = _TOOL_DEFINITIONS.get(name)
+        if definition:
+            parameters = definition["parameters"]
+            required = parameters.get("required", [])
+            entry["args"] = [
+                arg if arg in required else f"{arg}?" for arg in parameters["properties"]
+            ]
+        elif name in _CATALOG_ONLY_ARGS:
+            entry["args"] = list(_CATALOG_ONLY_ARGS[name])
+        tools.append(entry)
+    return json.dumps(tools, separators=(",", ":"))
+
+
+# Read-only tools whose results may be reused for identical calls, and the
+# tools that modify the filesystem (and so invalidate cached results)
+_CACHEABLE_TOOLS = frozenset({"read_file", "list_directory", "glob", "grep", "web_fetch"})
+_MUTATING_TOOLS = frozenset({"write_file", "edit_file", "bash"})
+
+# Arguments naming the filesystem path a tool call reads or writes
+_PATH_ARGUMENTS = ("file_path", "directory", "path")
+
+
+def _tool_call_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Get a canonical key for a tool call (same tool and arguments, same key)."""
+    return f"{tool_name}:{json_utils.dumps_key(arguments)}"
+
+
+def _tool_path(arguments: Dict[str, Any]) -> Optional[str]:
+    """Get the absolute path a tool call targets, if it names one."""
+    for name in _PATH_ARGUMENTS:
+        value = arguments.get(name)
+        if isinstance(value, str) and value:
+            return os.path.abspath(os.path.expanduser(value))
+    return None
+
+
+# Shared results for failed tool-call parses; they are only read downstream,
+# so the common failure paths return these instead of building new dicts
+_PARSE_ERROR_NO_JSON = MappingProxyType(
+    {"action": "parse_error", "error": "No JSON found in response", "success": False}
+)
+_PARSE_ERROR_NO_TOOL = MappingProxyType(
+    {"action": "parse_error", "error": "No tool name in response", "success": False}
+)
+
+# Very simple greetings and responses (no tool needed), matched exactly or as
+# a plain prefix of a short message (like str.startswith, so "history" counts)
+_SIMPLE_GREETINGS = frozenset({"hi", "hello", "hey", "thanks", "thank you", "bye", "yes", "no", "ok", "okay"})
+_GREETING_PREFIX_RE = re.compile(r"(?:hi|hello|hey|thanks|thank you|bye|yes|no|ok|okay)")
+
+# A plan that is only this token (see the system_plan prompt) signals that no
+# tool call is needed; the whole plan must match, not a step that mentions it
+_PLAN_DONE_RE = re.compile(r"\s*(?:NO_ACTION_NEEDED|no further action needed|task complete)\.?\s*", re.IGNORECASE)
+
+# Reply when the tool-selection call outlives llm_timeout
+_LLM_TIMEOUT_REPLY = (
+    "I'm sorry, the request took too long to process. "
+    "Please try a simpler request or check if Ollama is responding properly."
+)
+
+
+def _extract_json(text: str) -> Optional[str]:
+    """
+    Extract the first balanced JSON object from text.
+
+    Tracks brace depth while skipping braces inside string literals, so
+    nested objects are returned whole instead of being cut at the first "}".
+
+    Args:
+        text: Text that may contain a JSON object
+
+    Returns:
+        JSON object substring, or None if no complete object is found
+    """
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_string = False
+        escape = False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+        # Unbalanced from this position, try the next opening brace
+        start = text.find("{", start + 1)
+    return None
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Read a field from a dict-like response or an attribute-style one (ollama models)."""
+    if isinstance(obj, Mapping):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _response_text(response: Any) -> str:
+    """
+    Get the text of an Ollama generate() or chat() response.
+
+    Args:
+        response: generate()/chat() response, as a dict or an ollama
+            GenerateResponse/ChatResponse, or plain text
+
+    Returns:
+        Response text
+    """
+    if isinstance(response, str):
+        return response
+    # generate() returns: {"response": "text"}
+    response_text = _field(response, "response")
+    if not response_text:
+        # Fallback for chat() format: {"message": {"content": "text"}}
+        message = _field(response, "message")
+        response_text = _field(message, "content") if message is not None else None
+    return response_text if isinstance(response_text, str) else ""
+
+
+def _format_read_file(data: Dict[str, Any]) -> Optional[str]:
+    if "content" not in data:
+        return None
+    return f"```\n{data['content']}\n```"
+
+
+def _format_list_directory(data: Dict[str, Any]) -> Optional[str]:
+    if "files" not in data and "directories" not in data:
+        return None
+    names = [f"{d['name']}/" for d in data.get("directories", [])]
+    names.extend(f["name"] for f in data.get("files", []))
+    return "\n".join(names) if names else "(empty directory)"
+
+
+def _format_glob(data: Dict[str, Any]) -> Optional[str]:
+    if "matches" not in data:
+        return None
+    paths = [m["path"] for m in data["matches"]]
+    return "\n".join(paths) if paths else "(no matches)"
+
+
+def _format_bash(data: Dict[str, Any]) -> Optional[str]:
+    if not data.get("stdout"):
+        return None
+    return f"```\n{data['stdout'].rstrip()}\n```"
+
+
+# Tools whose successful output is user-ready as-is (see direct_tool_response);
+# each formatter returns None when the payload doesn't have the expected shape
+_DIRECT_RETURN_FORMATTERS: Mapping[str, Callable[[Dict[str, Any]], Optional[str]]] = MappingProxyType({
+    "read_file": _format_read_file,
+    "list_directory": _format_list_directory,
+    "glob": _format_glob,
+    "bash": _format_bash,
+})
+
+
+def _format_tool_result(tool_name: str, data: Any) -> Optional[str]:
+    """
+    Render a successful tool result directly for the user.
+
+    Args:
+        tool_name: Name of the tool that produced the result
+        data: Tool result payload (the MCP tool's return value)
+
+    Returns:
+        User-ready text, or None if the result needs the model to explain it
+    """
+    formatter = _DIRECT_RETURN_FORMATTERS.get(tool_name)
+    if formatter is None or not isinstance(data, dict):
+        return None
+    return formatter(data)
+
+
+def _parse_json_object(text: str) -> Optional[Any]:
+    """
+    Parse the JSON object in a model response.
+
+    Responses that are nothing but the object are parsed directly; otherwise
+    the object is located with _extract_json first.
+
+    Args:
+        text: Model response text
+
+    Returns:
+        Parsed object, or None if the text contains no JSON object
+
+    Raises:
+        ValueError: If the located object is not valid JSON
+    """
+    # Most failed responses are plain prose; skip stripping and scanning them
+    if "{" not in text:
+        return None
+    stripped = text.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
+        try:
+            return json_utils.loads(stripped)
+        except ValueError:
+            pass  # e.g. two objects or prose between braces; fall back to scanning
+    json_text = _extract_json(text)
+    if json_text is None:
+        return None
+    return json_utils.loads(json_text)
+
+
+class _JsonStreamScanner:
+    """Incrementally detect the first complete JSON object in streamed text."""
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Feed the next chunk of text.
+
+        Args:
+            chunk: Next piece of the streamed response
+
+        Returns:
+            The JSON object text once its closing brace arrives, else None
+        """
+        start = 0
+        for i, ch in enumerate(chunk):
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._parts = []
+                    start = i
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:i + 1])
+                    return "".join(self._parts)
+        if self._depth:
+            self._parts.append(chunk[start:])
+        return None
+
+
+class _ToolCacheState:
+    """Mutation bookkeeping for the tool cache, shared by an agent and its forks."""
+
+    __slots__ = ("generation", "mutations_in_flight")
+
+    def __init__(self) -> None:
+        # Bumped when a mutating tool starts and ends; a read only caches its
+        # result if no mutation started, ran or finished while it was running
+        self.generation = 0
+        self.mutations_in_flight = 0
+
+
 class AgentCore:
     """Core agent with Think -> Plan -> Act -> Observe -> Reflect loop."""
 
+    # One AgentCore per session; fixed slots avoid a per-instance __dict__
+    __slots__ = (
+        "config",
+        "agent_config",
+        "loop_config",
+        "ollama",
+        "context",
+        "error_recovery",
+        "tool_executor",
+        "enabled",
+        "verbose",
+        "max_steps",
+        "direct_tool_response",
+        "_available_tools_cache",
+        "_tool_catalog",
+        "_ollama_tools_cache",
+        "_tools_task",
+        "_response_cache",
+        "_response_cache_size",
+        "_tool_cache",
+        "_tool_cache_size",
+        "_tool_cache_ttl",
+        "_tool_cache_state",
+        "_quiet",
+        "_context_tokens",
+        "_heartbeat_after",
+        "_heartbeat_interval",
+        "_session_id",
+        "_op_counter",
+        "_last_success_summary",
+        "_think_enabled",
+        "_plan_enabled",
+        "_speculative_act",
+    )
+
     def __init__(self, config: Dict[str, Any], mcp_server_url: str = "http://localhost:8000"):
         """
         Initialize agent core.
@@ -23,7 +525,8 @@ class AgentCore:
         """
         self.config = config
         self.agent_config = config.get("agent", {})
-        self.loop_config = self.agent_config.get("loop", {})
+        # "loop" is a top-level section of agent_config.yaml
+        self.loop_config = config.get("loop") or self.agent_config.get("loop", {})
 
         # Initialize components
         self.ollama = OllamaClient(config)
@@ -38,10 +541,58 @@ class AgentCore:
         
         # Cache for available tools (fetched dynamically)
         self._available_tools_cache: Optional[List[str]] = None
+        # Compact tool catalog for prompts (built once from the cache above)
+        self._tool_catalog: Optional[str] = None
+        # Tools in Ollama function-calling format (built once, reset on model switch)
+        self._ollama_tools_cache: Optional[List[Dict[str, Any]]] = None
+        # In-flight or finished prefetch of the list above (see _prefetch_tools)
+        self._tools_task: Optional["asyncio.Task[List[Dict[str, Any]]]"] = None
+
+        # LRU cache of deterministic LLM phase results, keyed by prompt digest
+        self._response_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._response_cache_size = self.agent_config.get("response_cache_size", 512)
+
+        # LRU+TTL cache of read-only tool results, keyed by tool name and arguments
+        tool_cache_config = self.agent_config.get("tool_cache", {})
+        self._tool_cache: "OrderedDict[str, Tuple[float, Optional[str], Any]]" = OrderedDict()
+        self._tool_cache_size = tool_cache_config.get("max_size", 128)
+        self._tool_cache_ttl = tool_cache_config.get("ttl_seconds", 60)
+        self._tool_cache_state = _ToolCacheState()
+
+        # Prompt budget for conversation history: the context window minus
+        # room for the response. Off unless tokens.window_history is set, since
+        # a fixed budget would drop earlier turns on large-context models too
+        tokens_config = self.agent_config.get("tokens") or {}
+        self._context_tokens: Optional[int] = None
+        if tokens_config.get("window_history", False):
+            self._context_tokens = (
+                tokens_config.get("max_context_tokens", 2048) - tokens_config.get("response_reserve", 512)
+            )
+
+        # Progress dots while waiting on slow tool calls (interval 0 disables)
+        heartbeat_config = self.agent_config.get("heartbeat", {})
+        self._heartbeat_after = heartbeat_config.get("after_ms", 1000) / 1000
+        self._heartbeat_interval = heartbeat_config.get("interval_ms", 500) / 1000
+
+        # Cheap per-instance operation ids for error-recovery bookkeeping
+        self._session_id = secrets.token_hex(4)
+        self._op_counter = itertools.count()
+
+        # Return simple tool results as-is instead of asking the model to rephrase them
+        self.direct_tool_response = self.agent_config.get("direct_tool_response", False)
+        self._last_success_summary: Optional[str] = None
+
+        # Phase toggles are fixed for the lifetime of the agent
+        phases = self.loop_config.get("phases", {})
+        self._think_enabled = phases.get("think", {}).get("enabled", False)
+        self._plan_enabled = phases.get("plan", {}).get("enabled", False)
+        self._speculative_act = phases.get("act", {}).get("speculative", False)
+
+        # Set on forks, which skip non-verbose progress output
+        self._quiet = False
 
         # Add system message
-        system_prompt = get_system_prompt("main")
-        self.context.add_message("system", system_prompt)
+        self.context.add_message("system", _SYSTEM_PROMPT_MAIN)
 
     async def process_request(self, user_message: str) -> str:
         """
@@ -63,15 +614,62 @@ class AgentCore:
         # Agent mode - full agentic loop
         return await self._agentic_loop(user_message)
 
+    async def process_request_batch(self, messages: List[str], concurrency: int = 8) -> List[str]:
+        """
+        Process independent requests concurrently.
+
+        Each request runs in its own fresh conversation (see _fork), so
+        requests don't see each other's history. Ollama only decodes
+        requests in parallel up to its OLLAMA_NUM_PARALLEL setting; extra
+        concurrency just queues on the server.
+
+        Args:
+            messages: User messages, one per request
+            concurrency: Maximum requests in flight at once
+
+        Returns:
+            Agent responses, in the same order as messages
+        """
+        slots = asyncio.Semaphore(concurrency)
+
+        async def bounded(message: str) -> str:
+            async with slots:
+                return await self._fork().process_request(message)
+
+        return await asyncio.gather(*[bounded(m) for m in messages])
+
+    def _fork(self) -> "AgentCore":
+        """
+        Create an agent sharing this one's clients and caches but with a fresh conversation.
+
+        Forks don't stream or print reasoning or progress, since concurrent
+        output would interleave. The tool cache and its mutation bookkeeping
+        are shared, so a write in one fork invalidates reads in the others.
+
+        Returns:
+            New AgentCore
+        """
+        fork = object.__new__(AgentCore)
+        for name in AgentCore.__slots__:
+            setattr(fork, name, getattr(self, name))
+        fork.agent_config = {**self.agent_config, "stream_responses": False}
+        fork.verbose = False
+        fork._quiet = True
+        # Batch conversations are throwaway, don't persist them
+        memory_config = {**self.config.get("memory", {}), "persist": {"enabled": False}}
+        fork.context = ContextManager({**self.config, "memory": memory_config})
+        fork.context.add_message("system", _SYSTEM_PROMPT_MAIN)
+        fork._last_success_summary = None
+        return fork
+
     async def _direct_response(self, user_message: str) -> str:
         """Generate direct response without agentic loop (with streaming)."""
-        messages = self.context.get_messages_for_llm()
+        messages = self.context.get_messages_for_llm(self._context_tokens)
         
         # Use streaming for faster perceived response
         if self.agent_config.get("stream_responses", True):
             full_response = ""
-            # chat_stream() is a synchronous generator (ollama lib is sync)
-            for chunk in self.ollama.chat_stream(messages):
+            async for chunk in self.ollama.chat_stream_async(messages):
                 print(chunk, end="", flush=True)
                 full_response += chunk
             print()  # New line after streaming
@@ -85,6 +683,11 @@ class AgentCore:
             self.context.add_message("assistant", assistant_message)
             return assistant_message
 
+    @staticmethod
+    def _log(*lines: str) -> None:
+        """Write several verbose output lines with a single stdout write."""
+        sys.stdout.write("\n".join(lines) + "\n")
+
     def _is_conversational(self, message: str) -> bool:
         """
         Check if message is conversational (doesn't need tools).
@@ -97,22 +700,14 @@ class AgentCore:
             True if obviously conversational, False if might need tools
         """
         message_lower = message.lower().strip()
-        
-        # Very simple greetings and responses (no tool needed)
-        simple_greetings = ["hi", "hello", "hey", "thanks", "thank you", "bye", "yes", "no", "ok", "okay"]
-        
+
         # If it's just a greeting, it's conversational
-        if message_lower in simple_greetings:
+        if message_lower in _SIMPLE_GREETINGS:
             return True
-        
+
         # If message starts with greeting and is very short
-        for greeting in simple_greetings:
-            if message_lower.startswith(greeting) and len(message_lower.split()) <= 2:
-                return True
-        
-        # Everything else - let the LLM and tools handle it
-        # The model will decide if tools are needed
-        return False
+        # (everything else - let the LLM and tools decide if tools are needed)
+        return len(message_lower.split(None, 2)) <= 2 and _GREETING_PREFIX_RE.match(message_lower) is not None
 
     async def _get_tools_for_ollama(self) -> List[Dict[str, Any]]:
         """
@@ -121,6 +716,10 @@ class AgentCore:
         Returns:
             List of tool definitions for Ollama
         """
+        # Definitions are static and the tool list is cached, so build this once
+        if self._ollama_tools_cache is not None:
+            return self._ollama_tools_cache
+
         available_tools = await self._get_available_tools()
         
         # Ensure we have a valid list
@@ -130,189 +729,119 @@ class AgentCore:
             available_tools = ["read_file", "write_file", "list_directory", "bash", "grep", "glob"]
         
         # Convert to Ollama format (simplified - Ollama uses function calling format)
-        ollama_tools = []
-        
-        # Tool parameter definitions (optimized for Claude Code-like behavior)
-        tool_definitions = {
-            "read_file": {
-                "description": "Read contents of a file. Use the exact file path provided by the user.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string", 
-                            "description": "Path to the file to read (e.g., 'main.py', './config/settings.yaml')"
-                        },
-                        "offset": {
-                            "type": "integer", 
-                            "description": "Optional: Line number to start reading from (1-indexed)"
-                        },
-                        "limit": {
-                            "type": "integer", 
-                            "description": "Optional: Maximum number of lines to read"
-                        }
-                    },
-                    "required": ["file_path"]
-                }
-            },
-            "write_file": {
-                "description": "Write content to a file. Creates the file if it doesn't exist.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string", 
-                            "description": "Path to the file to write (e.g., 'output.txt')"
-                        },
-                        "content": {
-                            "type": "string", 
-                            "description": "Content to write to the file"
-                        }
-                    },
-                    "required": ["file_path", "content"]
-                }
-            },
-            "list_directory": {
-                "description": "List files and directories. IMPORTANT: Use '.' for current directory, not 'home' or other names.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "directory": {
-                            "type": "string", 
-                            "description": "Directory path. Use '.' for current/this directory, '..' for parent, or specify a path like './src'"
-                        },
-                        "pattern": {
-                            "type": "string", 
-                            "description": "Optional: Glob pattern to filter results (e.g., '*.py', '*.txt')"
-                        }
-                    },
-                    "required": ["directory"]
-                }
-            },
-            "bash": {
-                "description": "Execute a shell command in the current directory",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "command": {
-                            "type": "string", 
-                            "description": "Shell command to execute (e.g., 'ls -la', 'pwd', 'git status')"
-                        }
-                    },
-                    "required": ["command"]
-                }
-            },
-            "grep": {
-                "description": "Search for text patterns in files (like ripgrep). Use '.' to search in current directory.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "pattern": {
-                            "type": "string", 
-                            "description": "Text pattern to search for"
-                        },
-                        "path": {
-                            "type": "string", 
-                            "description": "Path to search in. Use '.' for current directory (default: '.')"
-                        }
-                    },
-                    "required": ["pattern"]
-                }
-            },
-            "glob": {
-                "description": "Find files matching a pattern. Use '.' to search from current directory.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "pattern": {
-                            "type": "string",
-                            "description": "Glob pattern (e.g., '**/*.py' for all Python files, '*.txt' for text files)"
-                        },
-                        "path": {
-                            "type": "string",
-                            "description": "Base directory to search from. Use '.' for current directory (default: '.')"
-                        }
-                    },
-                    "required": ["pattern"]
-                }
-            },
-            "edit_file": {
-                "description": "Edit a file by replacing text. Use for making changes to existing files.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "Path to the file to edit"
-                        },
-                        "old_string": {
-                            "type": "string",
-                            "description": "Exact text to find and replace"
-                        },
-                        "new_string": {
-                            "type": "string",
-                            "description": "New text to replace with"
-                        }
-                    },
-                    "required": ["file_path", "old_string", "new_string"]
-                }
-            }
-        }
-        
-        for tool_name in available_tools:
-            if tool_name in tool_definitions:
-                ollama_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": tool_name,
-                        "description": tool_definitions[tool_name]["description"],
-                        "parameters": tool_definitions[tool_name]["parameters"]
-                    }
-                })
-        
-        return ollama_tools
+        self._ollama_tools_cache = [
+            {"type": "function", "function": {"name": tool_name, **_TOOL_DEFINITIONS[tool_name]}}
+            for tool_name in available_tools
+            if tool_name in _TOOL_DEFINITIONS
+        ]
+        return self._ollama_tools_cache
+
+    def _prefetch_tools(self) -> "asyncio.Task[List[Dict[str, Any]]]":
+        """
+        Start (or reuse) the task resolving the Ollama tools list.
+
+        Returns:
+            Task whose result is _get_tools_for_ollama()
+        """
+        task = self._tools_task
+        if task is None or task.cancelled():
+            task = self._tools_task = asyncio.create_task(self._get_tools_for_ollama())
+        return task
 
     async def _agentic_loop(self, user_message: str) -> str:
         """Execute agentic loop with native Ollama tool calling (optimized)."""
+        verbose = self.verbose
+
+        # Start fetching the tool list now so it overlaps the phases below
+        tools_task = self._prefetch_tools()
+
         # Check if message is conversational
         if self._is_conversational(user_message):
-            if self.verbose:
+            if verbose:
                 print("\n[Agent] Conversational message detected, responding directly")
             return await self._direct_response(user_message)
 
         try:
             # Use native Ollama tool calling for single LLM call
-            # Get available tools in Ollama format
-            tools = await self._get_tools_for_ollama()
-
-            if self.verbose:
+            if verbose:
                 print("\n[Agent] Analyzing request and selecting tools...")
 
-            # Make single chat call with tools (with timeout)
-            messages = self.context.get_messages_for_llm()
-
+            messages = self.context.get_messages_for_llm(self._context_tokens)
             # Add timeout to prevent infinite hangs (default 60s)
             timeout = self.agent_config.get("llm_timeout", 60)
-            try:
-                response = await asyncio.wait_for(
+            # Timeout for tool execution (default 30s)
+            tool_timeout = self.agent_config.get("tool_timeout", 30)
+            # Read-only tool calls already dispatched while the response streamed
+            started: Dict[int, "asyncio.Task[Dict[str, Any]]"] = {}
+
+            # With speculative act, tool selection starts alongside Think/Plan
+            # instead of waiting for them (the plan then no longer guides it)
+            chat_task = None
+            if self._speculative_act and (self._think_enabled or self._plan_enabled):
+                tools = await tools_task
+                chat_task = asyncio.create_task(asyncio.wait_for(
                     self.ollama.chat(messages, tools=tools if tools else None),
                     timeout=timeout
-                )
-            except asyncio.TimeoutError:
-                if self.verbose:
-                    print(f"\n[Agent] LLM call timed out after {timeout}s")
-                return "I'm sorry, the request took too long to process. Please try a simpler request or check if Ollama is responding properly."
+                ))
+
+            # Optional Think/Plan phases (disabled by default in agent_config.yaml)
+            try:
+                _, plan = await self._reason(user_message, 1)
+            except BaseException:
+                if chat_task:
+                    chat_task.cancel()
+                raise
+            if plan and _PLAN_DONE_RE.fullmatch(plan):
+                if chat_task:
+                    chat_task.cancel()
+                if verbose:
+                    print("\n[Plan] No action needed, responding directly")
+                return await self._direct_response(user_message)
+
+            if chat_task is None:
+                # Get available tools in Ollama format (already resolved after the first turn)
+                tools = await tools_task
+                if plan:
+                    # Plan guides tool selection for this turn only (not stored in context)
+                    messages = [*messages, {"role": "system", "content": f"Plan:\n{plan}"}]
+                if self.agent_config.get("stream_responses", True):
+                    # Stream the first pass too, so text-only answers print as they arrive
+                    try:
+                        response, started = await asyncio.wait_for(
+                            self._stream_tool_selection(messages, tools, tool_timeout),
+                            timeout=timeout
+                        )
+                    except asyncio.TimeoutError:
+                        if verbose:
+                            print(f"\n[Agent] LLM call timed out after {timeout}s")
+                        return _LLM_TIMEOUT_REPLY
+                else:
+                    chat_task = asyncio.wait_for(
+                        self.ollama.chat(messages, tools=tools if tools else None),
+                        timeout=timeout
+                    )
+
+            # Make single chat call with tools (with timeout)
+            if chat_task is not None:
+                try:
+                    response = await chat_task
+                except asyncio.TimeoutError:
+                    if verbose:
+                        print(f"\n[Agent] LLM call timed out after {timeout}s")
+                    return _LLM_TIMEOUT_REPLY
             
             # Check for errors in response
-            if response.get("error"):
-                error_msg = response.get("message", {}).get("content", str(response.get("error")))
-                if self.verbose:
+            message = response.get("message", {})
+            error = response.get("error")
+            if error:
+                for task in started.values():
+                    task.cancel()
+                if verbose:
+                    error_msg = message.get("content", str(error))
                     print(f"\n[Agent] Error from model: {error_msg}")
                 # Fall back to direct response if tool calling not supported
                 return await self._direct_response(user_message)
             
-            message = response.get("message", {})
-            
             # Check if model wants to use tools
             tool_calls = message.get("tool_calls", [])
             
@@ -323,65 +852,38 @@ class AgentCore:
             if tool_calls and self.verbose:
                 print(f"\n[Agent] Model requested {len(tool_calls)} tool call(s)")
             
-            # Execute any tool calls
-            tool_results = []
+            # Execute the tool calls (read-only ones concurrently)
+            calls = []
             for i, tool_call in enumerate(tool_calls, 1):
                 function = tool_call.get("function", {})
                 tool_name = function.get("name")
                 arguments = function.get("arguments", {})
+                calls.append((tool_name, arguments))
 
-                if self.verbose:
-                    print(f"\n[Act] Executing tool {i}/{len(tool_calls)}: {tool_name}")
-                    print(f"[Act] Arguments: {arguments}")
-                else:
+                if verbose:
+                    self._log(
+                        f"\n[Act] Executing tool {i}/{len(tool_calls)}: {tool_name}",
+                        f"[Act] Arguments: {arguments}",
+                    )
+                elif not self._quiet:
                     # Show minimal progress even in non-verbose mode
                     print(f"⚙️  Executing: {tool_name}...")
 
-                try:
-                    # Add timeout for tool execution (default 30s)
-                    tool_timeout = self.agent_config.get("tool_timeout", 30)
-                    result = await asyncio.wait_for(
-                        self.tool_executor.execute_tool(tool_name, arguments),
-                        timeout=tool_timeout
-                    )
-                    tool_results.append({
-                        "tool": tool_name,
-                        "result": result,
-                        "success": result.get("success", False)
-                    })
-
-                    if self.verbose:
-                        status = "✓" if result.get("success") else "✗"
-                        print(f"[Act] {tool_name} - {status}")
-                        if not result.get("success"):
-                            err = result.get("error", "Unknown error")
-                            print(f"[Act] Error: {err}")
+            tool_results = await self._with_heartbeat(
+                self._run_tool_calls(calls, started, tool_timeout)
+            )
+
+            if verbose:
+                for r in tool_results:
+                    if r["success"]:
+                        self._log(f"[Act] {r['tool']} - ✓")
+                    else:
+                        err = r.get("error") or (r["result"] or {}).get("error", "Unknown error")
+                        self._log(f"[Act] {r['tool']} - ✗", f"[Act] Error: {err}")
 
-                except asyncio.TimeoutError:
-                    tool_results.append({
-                        "tool": tool_name,
-                        "result": None,
-                        "success": False,
-                        "error": f"Tool execution timed out after {tool_timeout}s"
-                    })
-                    if self.verbose:
-                        print(f"[Act] {tool_name} - ✗ (Timeout)")
-
-                except Exception as e:
-                    tool_results.append({
-                        "tool": tool_name,
-                        "result": None,
-                        "success": False,
-                        "error": str(e)
-                    })
-                    if self.verbose:
-                        print(f"[Act] {tool_name} - ✗ (Exception: {e})")
-            
             # If tools were called, add tool results to context and get final response
             if tool_results:
                 # Extract and format tool results cleanly for the model
-                import json
-
                 def truncate_content(content: str, max_tokens: int = None) -> tuple:
                     """
                     Truncate content if too large, keeping first and last portions.
@@ -418,11 +920,11 @@ class AgentCore:
                             result_data = result_data['result']
 
                         # Smart content extraction with truncation
+                        # (copy on truncation, the result may be shared with the tool cache)
                         if 'content' in result_data:
                             content, truncated = truncate_content(result_data['content'])
-                            result_data['content'] = content
                             if truncated:
-                                result_data['_truncated'] = True
+                                result_data = {**result_data, 'content': content, '_truncated': True}
 
                         formatted_results.append({
                             'tool': tool_name,
@@ -434,19 +936,29 @@ class AgentCore:
                             'error': r.get('error', 'Unknown error')
                         })
 
-                # Simple, clean context message - let the enhanced system prompt handle intelligence
-                results_json = json.dumps(formatted_results, indent=2)
+                # Compact JSON (no pretty-printing) keeps the prompt short - let the enhanced system prompt handle intelligence
+                results_json = json_utils.dumps(formatted_results)
                 self.context.add_message("tool", results_json)
                 
-                if self.verbose:
+                self._last_success_summary = None
+                if len(formatted_results) == 1 and "data" in formatted_results[0]:
+                    self._last_success_summary = _format_tool_result(
+                        formatted_results[0]["tool"], formatted_results[0]["data"]
+                    )
+
+                if verbose:
                     print(f"\n[Agent] Generating final response based on tool results...")
                 
                 # Get final response from model with streaming
-                if self.agent_config.get("stream_responses", True):
+                if self.direct_tool_response and self._last_success_summary is not None:
+                    # Tool output already answers the request, skip the extra LLM call
+                    final_response = await self._generate_final_response()
+                    if self.agent_config.get("stream_responses", True):
+                        print(final_response)
+                elif self.agent_config.get("stream_responses", True):
                     print()  # New line before streaming
                     final_response = ""
-                    # chat_stream() is a synchronous generator (ollama lib is sync)
-                    for chunk in self.ollama.chat_stream(self.context.get_messages_for_llm()):
+                    async for chunk in self.ollama.chat_stream_async(self.context.get_messages_for_llm(self._context_tokens)):
                         print(chunk, end="", flush=True)
                         final_response += chunk
                     print()  # New line after streaming
@@ -469,37 +981,370 @@ class AgentCore:
             
         except Exception as e:
             # Catch any errors in the tool calling flow
-            if self.verbose:
+            if verbose:
                 print(f"\n[Agent] Error in agentic loop: {e}")
             # Fall back to direct response
             return await self._direct_response(user_message)
 
-    async def _think(self, user_message: str, step: int) -> str:
+    async def _run_tool_calls(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        started: Dict[int, "asyncio.Task[Dict[str, Any]]"],
+        tool_timeout: float,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run one response's tool calls, keeping the order where it matters.
+
+        Consecutive read-only calls run concurrently, and identical ones
+        among them run once and share the result. Any other call (a write,
+        bash) runs alone in its original position, so calls after it see
+        its effects and calls before it don't.
+
+        Args:
+            calls: (tool name, arguments) pairs in the order the model gave them
+            started: Read-only calls already dispatched, keyed by call index
+            tool_timeout: Seconds to allow each tool
+
+        Returns:
+            One _run_tool() result per call, in call order
+        """
+        results: List[Dict[str, Any]] = [None] * len(calls)
+        # Read-only calls waiting to run together: key -> call indices
+        batch: Dict[str, List[int]] = {}
+
+        async def run_batch() -> None:
+            batch_results = await asyncio.gather(*[
+                started.get(indices[0]) or self._run_tool(*calls[indices[0]], tool_timeout)
+                for indices in batch.values()
+            ])
+            for indices, result in zip(batch.values(), batch_results):
+                for i in indices:
+                    results[i] = result
+            batch.clear()
+
+        for i, (tool_name, arguments) in enumerate(calls):
+            if tool_name in _CACHEABLE_TOOLS:
+                batch.setdefault(_tool_call_key(tool_name, arguments), []).append(i)
+                continue
+            if batch:
+                await run_batch()
+            results[i] = await self._run_tool(tool_name, arguments, tool_timeout)
+        if batch:
+            await run_batch()
+        return results
+
+    async def _stream_tool_selection(
+        self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]], tool_timeout: float
+    ) -> Tuple[Dict[str, Any], Dict[int, "asyncio.Task[Dict[str, Any]]"]]:
+        """
+        Stream the tool-calling chat, printing text as it arrives.
+
+        Read-only tool calls are dispatched as soon as they appear in the
+        stream, so they run while the model is still decoding. Tools that
+        modify anything wait for the complete response, and so do reads
+        that come after one (they may depend on its effects).
+
+        Args:
+            messages: Chat messages
+            tools: Tools in Ollama format
+            tool_timeout: Seconds to allow each dispatched tool
+
+        Returns:
+            Response shaped like OllamaClient.chat() (message with content and
+            tool_calls), and the tasks already started keyed by tool call index
+        """
+        parts: List[str] = []
+        tool_calls: List[Any] = []
+        started: Dict[int, "asyncio.Task[Dict[str, Any]]"] = {}
+        started_keys = set()
+        # Set once a mutating call is seen; later reads must wait for it
+        mutating_seen = False
+        # The stream is read on the event loop, so dispatched tools progress between chunks
+        stream = self.ollama.chat_stream_message_async(messages, tools=tools if tools else None)
+        try:
+            async for message in stream:
+                error = message.get("error")
+                if error:
+                    return {"message": {"role": "assistant", "content": f"Error in chat: {error}"}, "error": True}, started
+                content = message.get("content")
+                if content:
+                    if not parts:
+                        print()  # New line before streaming
+                    print(content, end="", flush=True)
+                    parts.append(content)
+                for tool_call in message.get("tool_calls") or ():
+                    function = tool_call.get("function", {})
+                    tool_name = function.get("name")
+                    arguments = function.get("arguments", {})
+                    key = _tool_call_key(tool_name, arguments)
+                    if tool_name in _MUTATING_TOOLS:
+                        mutating_seen = True
+                    # Duplicates reuse the first call's task (see _run_tool_calls)
+                    elif tool_name in _CACHEABLE_TOOLS and not mutating_seen and key not in started_keys:
+                        started_keys.add(key)
+                        started[len(tool_calls)] = asyncio.create_task(
+                            self._run_tool(tool_name, arguments, tool_timeout)
+                        )
+                    tool_calls.append(tool_call)
+        except BaseException:
+            # Timed out or cancelled mid-stream: nobody will collect these
+            for task in started.values():
+                task.cancel()
+            raise
+        if parts:
+            print()  # New line after streaming
+
+        return {"message": {"role": "assistant", "content": "".join(parts), "tool_calls": tool_calls}}, started
+
+    async def _with_heartbeat(self, awaitable: Any) -> Any:
+        """
+        Await something, printing a dot per interval once it has taken a while.
+
+        Args:
+            awaitable: Coroutine or future to wait for
+
+        Returns:
+            Its result
+        """
+        task = asyncio.ensure_future(awaitable)
+        if self._heartbeat_interval <= 0 or self._quiet:
+            return await task
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self._heartbeat_after)
+            if not done:
+                while not done:
+                    print(".", end="", flush=True)
+                    done, _ = await asyncio.wait({task}, timeout=self._heartbeat_interval)
+                print()
+        except BaseException:
+            task.cancel()
+            raise
+        return task.result()
+
+    async def _run_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Execute one tool call for the agentic loop, never raising.
+
+        Args:
+            tool_name: Name of the tool to execute
+            arguments: Tool arguments
+            timeout: Seconds to wait for the tool
+
+        Returns:
+            Dict with tool, result and success (plus error on failure)
+        """
+        try:
+            result = await asyncio.wait_for(
+                self._execute_tool(tool_name, arguments),
+                timeout=timeout
+            )
+            return {
+                "tool": tool_name,
+                "result": result,
+                "success": result.get("success", False)
+            }
+        except asyncio.TimeoutError:
+            return {
+                "tool": tool_name,
+                "result": None,
+                "success": False,
+                "error": f"Tool execution timed out after {timeout}s"
+            }
+        except Exception as e:
+            return {
+                "tool": tool_name,
+                "result": None,
+                "success": False,
+                "error": str(e)
+            }
+
+    async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a tool through the MCP server, reusing recent read-only results.
+
+        Args:
+            tool_name: Name of the tool to execute
+            arguments: Tool arguments
+
+        Returns:
+            Tool result
+        """
+        if tool_name in _MUTATING_TOOLS:
+            state = self._tool_cache_state
+            state.generation += 1
+            state.mutations_in_flight += 1
+            self._invalidate_tool_cache(tool_name, arguments)
+            try:
+                return await self.tool_executor.execute_tool(tool_name, arguments)
+            finally:
+                # Reads gathered alongside may have cached pre-write results
+                state.mutations_in_flight -= 1
+                state.generation += 1
+                self._invalidate_tool_cache(tool_name, arguments)
+
+        if tool_name not in _CACHEABLE_TOOLS or self._tool_cache_size <= 0:
+            return await self.tool_executor.execute_tool(tool_name, arguments)
+
+        key = _tool_call_key(tool_name, arguments)
+        entry = self._tool_cache.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] < self._tool_cache_ttl:
+                self._tool_cache.move_to_end(key)
+                return entry[2]
+            del self._tool_cache[key]
+
+        state = self._tool_cache_state
+        generation = state.generation
+        result = await self.tool_executor.execute_tool(tool_name, arguments)
+        if (
+            isinstance(result, dict)
+            and result.get("success")
+            and not state.mutations_in_flight
+            and generation == state.generation
+        ):
+            self._tool_cache[key] = (time.monotonic(), _tool_path(arguments), result)
+            if len(self._tool_cache) > self._tool_cache_size:
+                self._tool_cache.popitem(last=False)
+        return result
+
+    def _invalidate_tool_cache(self, tool_name: str, arguments: Dict[str, Any]) -> None:
+        """
+        Drop cached results a mutating tool call may have made stale.
+
+        Args:
+            tool_name: Name of the mutating tool
+            arguments: Its arguments
+        """
+        if not self._tool_cache:
+            return
+        target = None if tool_name == "bash" else _tool_path(arguments)
+        stale = []
+        for key, (_, path, _) in self._tool_cache.items():
+            if key.startswith("web_fetch:"):
+                continue
+            # bash can touch anything; otherwise match paths by prefix both ways
+            # (a file inside a listed directory, or a directory being rewritten)
+            if target is None or path is None or target.startswith(path) or path.startswith(target):
+                stale.append(key)
+        for key in stale:
+            del self._tool_cache[key]
+
+    async def _reason(self, user_message: str, step: int) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Run the enabled Think and Plan phases.
+
+        Both phases only depend on the user message, so they are issued
+        concurrently and cost max(think, plan) instead of think + plan.
+
+        Args:
+            user_message: User's message
+            step: Current step number
+
+        Returns:
+            (thought, plan) tuple; entries are None for disabled phases
+        """
+        think_enabled = self._think_enabled
+        plan_enabled = self._plan_enabled
+
+        coros = []
+        if think_enabled:
+            coros.append(self._think(user_message, step))
+        if plan_enabled:
+            coros.append(self._plan(user_message, step))
+        if not coros:
+            return None, None
+
+        results = await asyncio.gather(*coros)
+        thought = _response_text(results[0]) if think_enabled else None
+        plan = _response_text(results[-1]) if plan_enabled else None
+
+        if self.verbose:
+            lines = []
+            if thought:
+                lines.append(f"\n[Think] {thought}")
+            if plan:
+                lines.append(f"\n[Plan] {plan}")
+            if lines:
+                self._log(*lines)
+
+        return thought, plan
+
+    async def _think(self, user_message: str, step: int) -> Dict[str, Any]:
         """Think phase - analyze the request."""
         prompt = f"""Step {step}: Analyze this request:
 {user_message}
 
 What needs to be done? What information is needed?"""
 
-        response = await self.ollama.generate(
-            prompt=prompt,
-            system=get_system_prompt("system_think"),
-        )
-        return response
+        return await self._phase_chat("think", _SYSTEM_PROMPT_THINK, prompt)
 
-    async def _plan(self, user_message: str, step: int) -> str:
+    async def _plan(self, user_message: str, step: int) -> Dict[str, Any]:
         """Plan phase - create action plan."""
         prompt = f"""Step {step}: Create a plan for:
 {user_message}
 
 List the specific actions needed."""
 
-        response = await self.ollama.generate(
-            prompt=prompt,
-            system=get_system_prompt("system_plan"),
-        )
+        return await self._phase_chat("plan", _SYSTEM_PROMPT_PLAN, prompt)
+
+    async def _phase_chat(self, phase: str, instructions: str, prompt: str) -> Dict[str, Any]:
+        """
+        Run a reasoning phase as a chat turn appended to the conversation.
+
+        The conversation messages are a byte-identical prefix of the
+        tool-calling request, so Ollama can reuse their cached KV state;
+        only the final phase message differs.
+
+        Args:
+            phase: Phase name (used for the response cache key)
+            instructions: Phase system prompt
+            prompt: Phase-specific request
+
+        Returns:
+            Chat response
+        """
+        history = self.context.get_messages_for_llm(self._context_tokens)
+        # The answer depends on the conversation too, not just the prompt
+        key = self._cache_key(phase, prompt, history)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        messages = [*history, {"role": "user", "content": f"{instructions}\n{prompt}"}]
+        response = await self.ollama.chat(messages)
+        self._cache_put(key, response)
         return response
 
+    def _cache_key(
+        self, phase: str, prompt: str, history: Optional[List[Dict[str, Any]]] = None
+    ) -> bytes:
+        """Build a response-cache key from the phase, current model, prompt and any history sent."""
+        digest = hashlib.blake2b(
+            f"{phase}\0{self.ollama.get_current_model()}\0{prompt}".encode(), digest_size=16
+        )
+        if history:
+            digest.update(b"\0")
+            digest.update(json_utils.dumps_key(history).encode())
+        return digest.digest()
+
+    def _cache_get(self, key: bytes) -> Any:
+        """Get a cached response (None on miss), marking it most recently used."""
+        value = self._response_cache.get(key)
+        if value is not None:
+            self._response_cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key: bytes, value: Any) -> None:
+        """Cache a successful response, evicting the least recently used entry."""
+        if self._response_cache_size <= 0:
+            return
+        if isinstance(value, dict) and value.get("error"):
+            return
+        self._response_cache[key] = value
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > self._response_cache_size:
+            self._response_cache.popitem(last=False)
+
     async def _get_available_tools(self) -> List[str]:
         """
         Get available tools from MCP server (with caching).
@@ -520,79 +1365,63 @@ List the specific actions needed."""
                 ]
         return self._available_tools_cache
 
+    async def _get_tool_catalog(self) -> str:
+        """Get the compact tool catalog for tool-selection prompts (rendered once)."""
+        if self._tool_catalog is None:
+            self._tool_catalog = _render_tools_compact(await self._get_available_tools())
+        return self._tool_catalog
+
     async def _act_direct(self, user_request: str) -> Dict[str, Any]:
         """Act phase - directly determine and execute tool from user request."""
-        # Get available tools dynamically
-        available_tools = await self._get_available_tools()
-        
-        # Build tool descriptions
-        tool_list = "\n".join([f"- {tool}" for tool in available_tools])
-        
-        # Direct, concise prompt for tool selection
-        tool_selection_prompt = f"""User request: "{user_request}"
-
-Choose the ONE most appropriate tool and respond ONLY with valid JSON (no extra text):
-
-{{
-  "tool": "tool_name",
-  "arguments": {{...}}
-}}
-
-Available tools:
-{tool_list}
-
-Respond with JSON only."""
+        # Direct, concise prompt for tool selection (only the request varies)
+        tool_selection_prompt = (
+            f'User request: "{user_request}"\n\n'
+            + _TOOL_PROMPT_DIRECT
+            + await self._get_tool_catalog()
+            + "\n\nRespond with JSON only."
+        )
 
         try:
-            # Get tool call from model
-            response = await self.ollama.generate(
-                prompt=tool_selection_prompt,
-                temperature=0.1,  # Low temperature for more deterministic output
-            )
-
-            # Parse JSON response from Ollama
-            # generate() returns: {"response": "text"}
-            if isinstance(response, dict):
-                response_text = response.get("response", "")
-                if not response_text:
-                    # Fallback for chat() format: {"message": {"content": "text"}}
-                    response_text = response.get("message", {}).get("content", "")
-            else:
-                response_text = str(response)
-
-            # Extract JSON from response text
-            import json
-            import re
-
-            # Find JSON object in response
-            json_match = re.search(r'\{[\s\S]*?\}', response_text)
-            if not json_match:
-                return {
-                    "action": "parse_error",
-                    "error": f"No JSON found in response: {response[:200]}",
-                    "success": False,
-                }
-
-            tool_call = json.loads(json_match.group())
-            tool_name = tool_call.get("tool")
-            arguments = tool_call.get("arguments", {})
-
-            if not tool_name:
-                return {
-                    "action": "parse_error",
-                    "error": "No tool name in response",
-                    "success": False,
-                }
+            # Identical requests resolve to the same tool call (temperature=0.1)
+            key = self._cache_key("act_direct", tool_selection_prompt)
+            tool_call = self._cache_get(key)
+            if tool_call is None:
+                # Stream the tool call and stop as soon as the JSON object closes,
+                # skipping any trailing prose the model adds after it
+                stream = await self.ollama.generate(
+                    prompt=tool_selection_prompt,
+                    temperature=0.1,  # Low temperature for more deterministic output
+                    stream=True,
+                )
+                scanner = _JsonStreamScanner()
+                received: List[str] = []
+                json_text = None
+                try:
+                    async for chunk in stream:
+                        received.append(chunk)
+                        json_text = scanner.feed(chunk)
+                        if json_text:
+                            break
+                finally:
+                    await stream.aclose()
+
+                response_text = "".join(received)
+                if not json_text:
+                    # Stream ended without a balanced object, rescan the full text
+                    json_text = _extract_json(response_text)
+                if not json_text:
+                    if not self.verbose:
+                        return _PARSE_ERROR_NO_JSON
+                    return {
+                        **_PARSE_ERROR_NO_JSON,
+                        "error": f"No JSON found in response: {response_text[:200]}",
+                    }
 
-            # Execute the tool
-            result = await self.tool_executor.execute_tool(tool_name, arguments)
+                tool_call = json_utils.loads(json_text)
+                if tool_call.get("tool"):
+                    self._cache_put(key, tool_call)
 
-            return {
-                "action": tool_name,
-                "arguments": arguments,
-                "result": result,
-                "success": result.get("success", False),
-            }
+            return await self._execute_tool_call(tool_call)
 
         except Exception as e:
             return {
@@ -601,6 +1430,45 @@ Respond with JSON only."""
                 "success": False,
             }
 
+    async def _execute_tool_call(self, tool_call: Dict[str, Any], **error_info: Any) -> Dict[str, Any]:
+        """
+        Execute a parsed {"tool": ..., "arguments": ...} call (shared by _act and _act_direct).
+
+        Args:
+            tool_call: Parsed tool call from the model
+            **error_info: Extra fields to include in a parse_error result (verbose mode only)
+
+        Returns:
+            Action result
+        """
+        tool_name = tool_call.get("tool")
+        if not tool_name:
+            if not (error_info and self.verbose):
+                return _PARSE_ERROR_NO_TOOL
+            return {**_PARSE_ERROR_NO_TOOL, **error_info}
+
+        arguments = tool_call.get("arguments", {})
+        reasoning = tool_call.get("reasoning")
+
+        # Execute the tool
+        if self.verbose:
+            lines = [f"\n[Act] Executing: {tool_name}", f"[Act] Arguments: {arguments}"]
+            if reasoning:
+                lines.append(f"[Act] Reasoning: {reasoning}")
+            self._log(*lines)
+
+        result = await self._execute_tool(tool_name, arguments)
+
+        action_result = {
+            "action": tool_name,
+            "arguments": arguments,
+            "result": result,
+            "success": result.get("success", False),
+        }
+        if reasoning is not None:
+            action_result["reasoning"] = reasoning
+        return action_result
+
     async def _act(self, plan: Optional[str]) -> Dict[str, Any]:
         """Act phase - execute actions based on plan (fallback when plan phase enabled)."""
         if not plan:
@@ -612,77 +1480,30 @@ Respond with JSON only."""
 
         # Ask Ollama to generate a tool call based on the plan
         # Build messages with tool execution context
-        messages = self.context.get_messages_for_llm()
-        messages.append({
-            "role": "user",
-            "content": f"""Based on this plan: {plan}
-
-                Choose ONE tool to execute right now. Respond with a JSON object in this format:
-                {{
-                    "tool": "tool_name",
-                    "arguments": {{
-                        "param1": "value1",
-                        "param2": "value2"
-                    }},
-                    "reasoning": "why this tool and these arguments"
-                }}
-
-                Available tools:
-                - read_file(file_path, offset=None, limit=None)
-                - write_file(file_path, content, create_backup=None)
-                - edit_file(file_path, old_string, new_string, replace_all=False)
-                - list_directory(directory=".", pattern=None)
-                - grep(pattern, path=".", regex=False, case_insensitive=False, context_before=0, context_after=0, max_results=None, file_pattern=None)
-                - glob(pattern, path=".", max_results=None)
-                - find(name=None, path=".", file_type=None, max_depth=None)
-                - bash(command, timeout=None, cwd=None, background=False)
-                - web_fetch(url, timeout=None)
-                - web_search(query, max_results=10)
-
-                Respond ONLY with the JSON object, no other text."""
-                        })
+        messages = [
+            *self.context.get_messages_for_llm(self._context_tokens),
+            {
+                "role": "user",
+                "content": (
+                    f"Based on this plan: {plan}\n\n"
+                    + _TOOL_PROMPT_PLAN
+                    + await self._get_tool_catalog()
+                    + "\n\nRespond ONLY with the JSON object, no other text."
+                ),
+            },
+        ]
 
         # Get tool call from Ollama
         response = await self.ollama.chat(messages)
         content = response.get("message", {}).get("content", "")
 
         # Try to parse tool call from response
-        import json
-        import re
-
         try:
             # Extract JSON from response (in case there's extra text)
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if json_match:
-                tool_call = json.loads(json_match.group())
-
-                tool_name = tool_call.get("tool")
-                arguments = tool_call.get("arguments", {})
-                reasoning = tool_call.get("reasoning", "")
-
-                if not tool_name:
-                    return {
-                        "action": "parse_error",
-                        "error": "No tool name in response",
-                        "response": content,
-                        "success": False,
-                    }
-
-                # Execute the tool
-                if self.verbose:
-                    print(f"\n[Act] Executing: {tool_name}")
-                    print(f"[Act] Arguments: {arguments}")
-                    print(f"[Act] Reasoning: {reasoning}")
-
-                result = await self.tool_executor.execute_tool(tool_name, arguments)
-
-                return {
-                    "action": tool_name,
-                    "arguments": arguments,
-                    "reasoning": reasoning,
-                    "result": result,
-                    "success": result.get("success", False),
-                }
+            tool_call = _parse_json_object(content)
+            if tool_call is not None:
+                tool_call.setdefault("reasoning", "")
+                return await self._execute_tool_call(tool_call, response=content)
 
             else:
                 return {
@@ -692,7 +1513,7 @@ Respond with JSON only."""
                     "success": False,
                 }
 
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             return {
                 "action": "json_error",
                 "error": f"Failed to parse JSON: {str(e)}",
@@ -714,7 +1535,7 @@ Respond with JSON only."""
         # Check for errors
         if not action_result.get("success", True):
             error = action_result.get("error", {})
-            operation_id = str(uuid.uuid4())
+            operation_id = f"{self._session_id}-{next(self._op_counter)}"
 
             # Try error recovery
             recovery = await self.error_recovery.handle_error(
@@ -730,6 +1551,10 @@ Respond with JSON only."""
             }
 
         # Success
+        result = action_result.get("result")
+        data = result.get("result", {}) if isinstance(result, dict) else None
+        self._last_success_summary = _format_tool_result(action_result.get("action", ""), data)
+
         return {
             "complete": True,
             "error": None,
@@ -748,7 +1573,11 @@ Respond with JSON only."""
 
     async def _generate_final_response(self) -> str:
         """Generate final response to user."""
-        messages = self.context.get_messages_for_llm()
+        summary, self._last_success_summary = self._last_success_summary, None
+        if self.direct_tool_response and summary is not None:
+            return summary
+
+        messages = self.context.get_messages_for_llm(self._context_tokens)
         response = await self.ollama.chat(messages)
 
         return response.get("message", {}).get("content", "Task completed.")
@@ -764,7 +1593,11 @@ Respond with JSON only."""
 
     def switch_model(self, model_name: str) -> bool:
         """Switch Ollama model."""
-        return self.ollama.switch_model(model_name)
+        switched = self.ollama.switch_model(model_name)
+        if switched:
+            self._ollama_tools_cache = None
+            self._tools_task = None
+        return switched
 
     def get_current_model(self) -> str:
         """Get current model name."""
@@ -776,4 +1609,11 @@ Respond with JSON only."""
 
     async def cleanup(self) -> None:
         """Cleanup resources."""
-        await self.tool_executor.close()
+        # The context journal is flushed even if closing a connection fails
+        try:
+            await self.tool_executor.close()
+        finally:
+            try:
+                await self.ollama.close()
+            finally:
+                self.context.close()
@@ -1,9 +1,73 @@
 """Context and conversation management."""
 
-import json
+import asyncio
+import os
+import re
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional
 from datetime import datetime
+from agent import json_utils
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+
+# Message roles sent to the LLM
+_LLM_ROLES = frozenset({"user", "assistant", "system", "tool"})
+
+# Journal lines buffered before a write is forced, regardless of the interval
+_JOURNAL_BATCH = 8
+
+
+# Session fields near the start of a saved file: the JSONL metadata header,
+# or the first keys of a JSON save (compact or indented)
+_SESSION_FIELD_RE = re.compile(rb'"(session_id|timestamp)":\s*"([^"]*)"')
+# Bytes read from each file when listing sessions
+_SESSION_HEAD_BYTES = 512
+
+
+def _read_session_meta(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a saved conversation's metadata without loading its messages.
+
+    Args:
+        path: Path to a conversation_*.json or conversation_*.jsonl file
+
+    Returns:
+        Dict with session_id, timestamp and path, or None if unreadable
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_SESSION_HEAD_BYTES)
+    except OSError:
+        return None
+
+    fields = {}
+    for key, value in _SESSION_FIELD_RE.findall(head):
+        fields.setdefault(key.decode(), value.decode())
+    if "session_id" not in fields:
+        return None
+    return {"session_id": fields["session_id"], "timestamp": fields.get("timestamp"), "path": path}
+
+
+def _compress(data: bytes) -> bytes:
+    """Compress a warm-tier record (zstandard if installed, else zlib)."""
+    if zstandard is not None:
+        return zstandard.compress(data)
+    return zlib.compress(data)
+
+
+def _decompress(data: bytes) -> bytes:
+    """Decompress a record written by _compress()."""
+    if zstandard is not None:
+        return zstandard.decompress(data)
+    return zlib.decompress(data)
 
 
 class ContextManager:
@@ -20,8 +84,49 @@ class ContextManager:
         self.enabled = self.config.get("enabled", True)
         self.max_messages = self.config.get("max_messages", 100)
         self.messages: List[Dict[str, Any]] = []
+
+        # Trimming settings are read on every overflow, resolve them once
+        summarize_config = self.config.get("summarize", {})
+        self._summarize_enabled = summarize_config.get("enabled", True)
+        self._summarize_threshold = summarize_config.get("threshold_messages", 50)
+        self._summarize_keep_recent = summarize_config.get("keep_recent", 10)
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
 
+        # Bumped on every change to self.messages. The LLM view is extended in
+        # place by add_message and rebuilt after any other change
+        self.version = 0
+        self._llm_cache: List[Dict[str, str]] = []
+        self._llm_cache_version = -1
+        # Windowed LLM view, cached per (version, max_tokens)
+        self._window_cache: List[Dict[str, str]] = []
+        self._window_cache_key: Optional[tuple] = None
+
+        # Warm tier: messages trimmed from self.messages, kept compressed so
+        # they can be rehydrated by id (ids count trimmed messages from 0)
+        self._warm: "OrderedDict[int, bytes]" = OrderedDict()
+        self._warm_max = self.config.get("warm_messages", 1000)
+        self._next_warm_id = 0
+
+        # Tool results older than this many user turns are left out of the LLM view
+        self.tool_result_turns = self.config.get("tool_result_turns", 2)
+
+        # With persist.format "jsonl", messages are appended to a journal file
+        # as they are added instead of rewriting the whole session on save()
+        persist_config = self.config.get("persist", {})
+        self._journal_enabled = (
+            persist_config.get("enabled", True) and persist_config.get("format", "json") == "jsonl"
+        )
+        self._journal: Optional[BinaryIO] = None
+        # Set when the journal no longer matches self.messages (after clear/load)
+        self._journal_stale = False
+        # Journal read by load(), which later messages are appended to
+        self._journal_resume: Optional[str] = None
+        # Inside an event loop, lines added in quick succession are written
+        # together after flush_interval_ms
+        self._journal_pending: List[bytes] = []
+        self._journal_flush_delay = persist_config.get("flush_interval_ms", 20) / 1000
+        self._journal_flush_handle: Optional[asyncio.TimerHandle] = None
+
     def add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """
         Add a message to context.
@@ -37,77 +142,345 @@ class ContextManager:
         message = {
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat(),
+            # Epoch nanoseconds: cheaper to produce and serialize than ISO text
+            "ts": time.time_ns(),
         }
 
         if metadata:
             message["metadata"] = metadata
 
         self.messages.append(message)
+        self.version += 1
+        if self._llm_cache_version == self.version - 1:
+            if role in _LLM_ROLES:
+                self._llm_cache.append({"role": role, "content": content})
+            self._llm_cache_version = self.version
+
+        if self._journal_enabled:
+            self._append_to_journal(message)
 
         # Trim if needed
         if len(self.messages) > self.max_messages:
             self._trim_messages()
 
     def _trim_messages(self) -> None:
-        """Trim messages to fit within max_messages."""
-        summarize_config = self.config.get("summarize", {})
-        if summarize_config.get("enabled", True):
+        """Trim messages to fit within max_messages (in place, no list rebuild)."""
+        if self._summarize_enabled:
             # Keep system message, recent messages, and summarize the rest
-            threshold = summarize_config.get("threshold_messages", 50)
-            keep_recent = summarize_config.get("keep_recent", 10)
+            keep_recent = self._summarize_keep_recent
 
-            if len(self.messages) > threshold:
+            if len(self.messages) > self._summarize_threshold:
                 # Keep first (system) and last N messages
-                recent = self.messages[-keep_recent:]
-                self.messages = self.messages[:1] + [
-                    {
-                        "role": "system",
-                        "content": f"[Previous {len(self.messages) - keep_recent - 1} messages summarized]",
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                ] + recent
+                summary = {
+                    "role": "system",
+                    "content": f"[Previous {len(self.messages) - keep_recent - 1} messages summarized]",
+                    "ts": time.time_ns(),
+                }
+                end = len(self.messages) - keep_recent
+                self._move_to_warm(self.messages[1:end])
+                self.messages[1:end] = [summary]
+                self._llm_cache_version = -1
         else:
             # Simple truncation - remove oldest (except first)
-            self.messages = [self.messages[0]] + self.messages[-(self.max_messages - 1):]
+            end = len(self.messages) - (self.max_messages - 1)
+            self._move_to_warm(self.messages[1:end])
+            del self.messages[1:end]
+            self._llm_cache_version = -1
+
+    def _move_to_warm(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Compress messages that are being trimmed into the warm tier.
+
+        System messages (earlier summary placeholders) are skipped. Beyond warm_messages the oldest
+        entries are dropped; in jsonl mode the journal still has them.
 
-    def get_messages(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        Args:
+            messages: Messages about to be removed from self.messages
+        """
+        if self._warm_max <= 0:
+            return
+        for message in messages:
+            if message["role"] == "system":
+                continue
+            self._warm[self._next_warm_id] = _compress(json_utils.dumps_bytes(message))
+            self._next_warm_id += 1
+        while len(self._warm) > self._warm_max:
+            self._warm.popitem(last=False)
+
+    def rehydrate(self, msg_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a message that was trimmed from the conversation.
+
+        Args:
+            msg_id: Warm-tier id (0 for the first trimmed message, and so on)
+
+        Returns:
+            The message, or None if it is no longer in the warm tier
+        """
+        data = self._warm.get(msg_id)
+        if data is None:
+            return None
+        return json_utils.loads(_decompress(data))
+
+    def get_messages(
+        self,
+        limit: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Get conversation messages.
 
+        Without a limit or budget this is the live message list rather than
+        a copy, so callers must not mutate it.
+
         Args:
             limit: Maximum number of messages to return
+            max_chars: Stop adding older messages once their contents total
+                more than this many characters (the newest is always kept)
 
         Returns:
             List of messages
         """
-        if limit:
-            return self.messages[-limit:]
-        return self.messages.copy()
+        messages = self.messages[-limit:] if limit else self.messages
+        if max_chars is None:
+            return messages
 
-    def get_messages_for_llm(self) -> List[Dict[str, str]]:
+        # Walk back from the newest message until the budget is spent
+        start = len(messages)
+        total = 0
+        while start > 0:
+            total += len(messages[start - 1]["content"])
+            if total > max_chars and start < len(messages):
+                break
+            start -= 1
+        return messages[start:]
+
+    def get_messages_for_llm(self, max_tokens: Optional[int] = None) -> List[Dict[str, str]]:
         """
         Get messages formatted for LLM.
 
+        The list is cached and kept up to date as messages are added, so
+        callers must not mutate it (copy it before appending extra messages)
+        and should not hold on to it across add_message() calls.
+
+        Args:
+            max_tokens: Approximate token budget; older history is dropped to
+                fit (see _window). None sends the full history.
+
         Returns:
             List of messages in LLM format
         """
-        return [
-            {"role": msg["role"], "content": msg["content"]}
-            for msg in self.messages
-            if msg["role"] in ["user", "assistant", "system", "tool"]
-        ]
+        if self._llm_cache_version != self.version:
+            self._llm_cache = [
+                {"role": msg["role"], "content": msg["content"]}
+                for msg in self.messages
+                if msg["role"] in _LLM_ROLES
+            ]
+            self._llm_cache_version = self.version
+        if max_tokens is None:
+            return self._llm_cache
+
+        key = (self.version, max_tokens)
+        if self._window_cache_key != key:
+            self._window_cache = self._window(self._llm_cache, max_tokens)
+            self._window_cache_key = key
+        return self._window_cache
+
+    def _window(self, messages: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
+        """
+        Fit messages into a token budget (estimated at ~4 characters per token).
+
+        The leading system prompt and the current turn (from the last user
+        message on) are always kept. Earlier messages are added newest first
+        while they fit, skipping tool results more than tool_result_turns
+        user turns old.
+
+        Args:
+            messages: Full LLM view
+            max_tokens: Token budget
+
+        Returns:
+            Windowed messages in original order
+        """
+        head_end = 1 if messages and messages[0]["role"] == "system" else 0
+        current = len(messages)
+        for i in range(len(messages) - 1, head_end - 1, -1):
+            if messages[i]["role"] == "user":
+                current = i
+                break
+
+        budget = max_tokens * 4
+        for msg in messages[:head_end] + messages[current:]:
+            budget -= len(msg["content"])
+
+        kept: List[Dict[str, str]] = []
+        turns_back = 0
+        for msg in reversed(messages[head_end:current]):
+            if msg["role"] == "user":
+                turns_back += 1
+            elif msg["role"] == "tool" and turns_back >= self.tool_result_turns:
+                continue
+            budget -= len(msg["content"])
+            if budget < 0:
+                break
+            kept.append(msg)
+
+        if len(kept) == current - head_end:
+            return messages
+        kept.reverse()
+        return messages[:head_end] + kept + messages[current:]
 
     def clear(self) -> None:
         """Clear conversation history."""
         self.messages = []
+        self._warm.clear()
+        self._next_warm_id = 0
+        self.version += 1
+        self._journal_stale = True
+        self._journal_resume = None
+
+    def _persist_dir(self) -> Path:
+        """Get (and create) the directory conversations are saved to."""
+        persist_config = self.config.get("persist", {})
+        persist_dir = Path(persist_config.get("directory", "~/.claude-agent/history")).expanduser()
+        persist_dir.mkdir(parents=True, exist_ok=True)
+        return persist_dir
+
+    @classmethod
+    def list_sessions_meta(cls, directory: str) -> List[Dict[str, Any]]:
+        """
+        List saved conversations, e.g. for a session picker.
+
+        Only the start of each file is read, on a thread pool, so listing
+        many long histories stays cheap.
+
+        Args:
+            directory: Directory conversations are saved to
+
+        Returns:
+            Dicts with session_id, timestamp and path, newest first
+        """
+        try:
+            with os.scandir(Path(directory).expanduser()) as entries:
+                paths = [
+                    entry.path for entry in entries
+                    if entry.name.startswith("conversation_")
+                    and entry.name.endswith((".json", ".jsonl"))
+                    and entry.is_file()
+                ]
+        except OSError:
+            return []
+
+        with ThreadPoolExecutor() as pool:
+            sessions = [meta for meta in pool.map(_read_session_meta, paths) if meta]
+        sessions.sort(key=lambda meta: meta["timestamp"] or "", reverse=True)
+        return sessions
+
+    def _journal_path(self) -> Path:
+        """Get the JSONL journal path for the current session."""
+        return self._persist_dir() / f"conversation_{self.session_id}.jsonl"
+
+    def _append_to_journal(self, message: Dict[str, Any]) -> None:
+        """
+        Append one message to the session journal.
+
+        The journal starts with a session_metadata record followed by one
+        message per line. After clear() it is rewritten from self.messages,
+        so it always reloads to the current conversation. After a journal
+        is loaded, messages are appended to that file instead, which keeps
+        the messages load() trimmed from memory.
+
+        When called from a running event loop the line is buffered and
+        written with any others added within flush_interval_ms (or once
+        _JOURNAL_BATCH lines are pending); otherwise it is written at once.
+
+        Args:
+            message: Message that was just added
+        """
+        if self._journal is None or self._journal_stale:
+            # The new message is already in self.messages
+            self._journal_pending.clear()
+            if not self._resume_journal():
+                self._rewrite_journal()
+                self._journal.flush()
+                return
+
+        self._journal_pending.append(json_utils.dumps_bytes(message) + b"\n")
+        if len(self._journal_pending) >= _JOURNAL_BATCH or self._journal_flush_delay <= 0:
+            self._flush_journal()
+            return
+
+        if self._journal_flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._flush_journal()
+                return
+            self._journal_flush_handle = loop.call_later(self._journal_flush_delay, self._flush_journal)
+
+    def _flush_journal(self) -> None:
+        """Write any buffered journal lines in one call."""
+        if self._journal_flush_handle is not None:
+            self._journal_flush_handle.cancel()
+            self._journal_flush_handle = None
+        if self._journal is None or not self._journal_pending:
+            return
+        self._journal.write(b"".join(self._journal_pending))
+        self._journal_pending.clear()
+        self._journal.flush()
 
-    def save(self, filepath: Optional[str] = None) -> str:
+    def _resume_journal(self) -> bool:
+        """
+        Reopen the journal load() read from, to append to it.
+
+        Returns:
+            True if the loaded journal was reopened
+        """
+        path, self._journal_resume = self._journal_resume, None
+        if path is None:
+            return False
+        try:
+            journal = open(path, "ab")
+        except OSError:
+            return False
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = journal
+        self._journal_stale = False
+        return True
+
+    def _rewrite_journal(self) -> None:
+        """Start the session journal over from the current messages."""
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self._journal_path(), "wb")
+        header = {
+            "type": "session_metadata",
+            "session_id": self.session_id,
+            "timestamp": datetime.now().isoformat(),
+        }
+        self._journal.write(json_utils.dumps_bytes(header) + b"\n")
+        self._journal.writelines(json_utils.dumps_bytes(m) + b"\n" for m in self.messages)
+        self._journal_stale = False
+
+    def close(self) -> None:
+        """Flush and close the session journal, if one is open."""
+        self._flush_journal()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def save(self, filepath: Optional[str] = None, pretty: bool = False) -> str:
         """
         Save conversation to file.
 
+        In jsonl mode the journal is already up to date, so saving without a
+        filepath just returns its path.
+
         Args:
             filepath: Path to save file
+            pretty: Indent the JSON for reading (compact by default, which is
+                about half the size and faster to write)
 
         Returns:
             Path where conversation was saved
@@ -116,10 +489,17 @@ class ContextManager:
         if not persist_config.get("enabled", True):
             return ""
 
+        if not filepath and self._journal_enabled:
+            if self._journal is None or self._journal_stale:
+                self._journal_pending.clear()
+                if not self._resume_journal():
+                    self._rewrite_journal()
+            self._flush_journal()
+            self._journal.flush()
+            return self._journal.name
+
         if not filepath:
-            persist_dir = Path(persist_config.get("directory", "~/.claude-agent/history")).expanduser()
-            persist_dir.mkdir(parents=True, exist_ok=True)
-            filepath = str(persist_dir / f"conversation_{self.session_id}.json")
+            filepath = str(self._persist_dir() / f"conversation_{self.session_id}.json")
 
         data = {
             "session_id": self.session_id,
@@ -127,8 +507,9 @@ class ContextManager:
             "messages": self.messages,
         }
 
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        # Serialize in one go and write it with a single call
+        with open(filepath, "wb") as f:
+            f.write(json_utils.dumps_bytes(data, indent=pretty))
 
         return filepath
 
@@ -136,6 +517,8 @@ class ContextManager:
         """
         Load conversation from file.
 
+        Accepts both saved JSON files and JSONL journals.
+
         Args:
             filepath: Path to conversation file
 
@@ -143,11 +526,38 @@ class ContextManager:
             True if successful
         """
         try:
-            with open(filepath, "r") as f:
-                data = json.load(f)
+            with open(filepath, "rb") as f:
+                first_line = f.readline()
+                header = None
+                try:
+                    header = json_utils.loads(first_line)
+                except ValueError:
+                    pass  # e.g. "{" alone on the first line of an indented JSON file
+
+                is_journal = isinstance(header, dict) and header.get("type") == "session_metadata"
+                if is_journal:
+                    # Journal: read one message per line
+                    data = {
+                        "session_id": header.get("session_id"),
+                        "messages": [json_utils.loads(line) for line in f if line.strip()],
+                    }
+                else:
+                    data = json_utils.loads(first_line + f.read())
 
+            # Finish the previous session's journal before switching
+            self.close()
             self.messages = data.get("messages", [])
-            self.session_id = data.get("session_id", self.session_id)
+            self._warm.clear()
+            self._next_warm_id = 0
+            # Journals keep messages that were trimmed from memory
+            if len(self.messages) > self.max_messages:
+                self._trim_messages()
+            self.version += 1
+            self.session_id = data.get("session_id") or self.session_id
+            self._journal_stale = True
+            # Keep adding to a loaded journal: rewriting it from self.messages
+            # would drop whatever was trimmed above
+            self._journal_resume = filepath if is_journal else None
             return True
 
         except Exception:
@@ -1,7 +1,9 @@
 """Intelligent error recovery system."""
 
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
 from enum import Enum
 
 
@@ -16,6 +18,13 @@ class RetryStrategy(str, Enum):
     REPORT_AND_ASK = "report_and_ask"
 
 
+# Operations whose retry counts are tracked before the oldest are forgotten
+_MAX_TRACKED_OPERATIONS = 1024
+
+# Strategy by action name, so lookups don't go through Enum construction
+_STRATEGY_BY_NAME: Mapping[str, RetryStrategy] = MappingProxyType({s.value: s for s in RetryStrategy})
+
+
 class ErrorRecoverySystem:
     """System for intelligent error recovery and retry logic."""
 
@@ -30,7 +39,34 @@ class ErrorRecoverySystem:
         self.enabled = self.config.get("enabled", True)
         self.max_retries = self.config.get("max_retries", 3)
         self.strategies = self.config.get("strategies", {})
-        self.retry_counts: Dict[str, int] = {}
+        # Least recently retried first; bounded by _MAX_TRACKED_OPERATIONS
+        self.retry_counts: "OrderedDict[str, int]" = OrderedDict()
+
+        # Configured strategy per error type (types without an action are left out)
+        self._strategy_by_type: Dict[str, RetryStrategy] = {
+            error_type: _STRATEGY_BY_NAME.get(strategy["action"], RetryStrategy.REPORT_AND_ASK)
+            for error_type, strategy in self.strategies.items()
+            if strategy.get("action")
+        }
+
+        # Exponential backoff wait per retry count, clamped to backoff_max
+        backoff_config = self.strategies.get("network_error", {})
+        backoff_base = backoff_config.get("backoff_base", 2)
+        backoff_max = backoff_config.get("backoff_max", 30)
+        self._backoff_table = tuple(
+            min(backoff_base ** retry_count, backoff_max) for retry_count in range(self.max_retries + 2)
+        )
+
+        # Handler per retry strategy, used by _execute_strategy()
+        self._handlers: Dict[RetryStrategy, Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = {
+            RetryStrategy.REQUEST_APPROVAL: self._request_approval,
+            RetryStrategy.SEARCH_ALTERNATIVES: self._search_alternatives,
+            RetryStrategy.FIX_AND_RETRY: self._fix_and_retry,
+            RetryStrategy.EXPONENTIAL_BACKOFF: self._exponential_backoff,
+            RetryStrategy.INCREASE_TIMEOUT: self._increase_timeout,
+            RetryStrategy.WAIT_AND_RETRY: self._wait_and_retry,
+            RetryStrategy.REPORT_AND_ASK: self._report_and_ask,
+        }
 
     def should_retry(self, error: Dict[str, Any], operation_id: str) -> bool:
         """
@@ -65,20 +101,11 @@ class ErrorRecoverySystem:
         Returns:
             Retry strategy or None
         """
-        error_type = error.get("error_type", "unknown")
         strategy_name = error.get("retry_strategy")
-
-        if not strategy_name:
-            strategy_config = self.strategies.get(error_type, {})
-            strategy_name = strategy_config.get("action")
-
         if strategy_name:
-            try:
-                return RetryStrategy(strategy_name)
-            except ValueError:
-                return RetryStrategy.REPORT_AND_ASK
+            return _STRATEGY_BY_NAME.get(strategy_name, RetryStrategy.REPORT_AND_ASK)
 
-        return None
+        return self._strategy_by_type.get(error.get("error_type", "unknown"))
 
     async def handle_error(
         self,
@@ -114,87 +141,94 @@ class ErrorRecoverySystem:
 
         # Increment retry count
         self.retry_counts[operation_id] = self.retry_counts.get(operation_id, 0) + 1
+        self.retry_counts.move_to_end(operation_id)
+        if len(self.retry_counts) > _MAX_TRACKED_OPERATIONS:
+            self.retry_counts.popitem(last=False)
 
         # Execute strategy
-        recovery = await self._execute_strategy(strategy, error, context)
+        recovery = self._execute_strategy(strategy, error, context)
         recovery["retry_count"] = self.retry_counts[operation_id]
 
         return recovery
 
-    async def _execute_strategy(
+    def _execute_strategy(
         self,
         strategy: RetryStrategy,
         error: Dict[str, Any],
         context: Dict[str, Any],
     ) -> Dict[str, Any]:
         """Execute a specific retry strategy."""
-
-        if strategy == RetryStrategy.REQUEST_APPROVAL:
-            return {
-                "action": "request_approval",
-                "message": "Requesting user approval",
-                "resource": context.get("resource"),
-                "operation": context.get("operation"),
-                "suggestions": error.get("suggestions", []),
-            }
-
-        elif strategy == RetryStrategy.SEARCH_ALTERNATIVES:
-            return {
-                "action": "search",
-                "message": "Searching for alternatives",
-                "pattern": context.get("pattern"),
-                "suggestions": error.get("suggestions", []),
-            }
-
-        elif strategy == RetryStrategy.FIX_AND_RETRY:
-            return {
-                "action": "fix",
-                "message": "Attempting to fix the issue",
-                "error_details": error.get("details", {}),
-                "suggestions": error.get("suggestions", []),
-            }
-
-        elif strategy == RetryStrategy.EXPONENTIAL_BACKOFF:
-            backoff_config = self.strategies.get("network_error", {})
-            backoff_base = backoff_config.get("backoff_base", 2)
-            backoff_max = backoff_config.get("backoff_max", 30)
-            retry_count = self.retry_counts.get(context.get("operation_id", ""), 0)
-
-            wait_time = min(backoff_base ** retry_count, backoff_max)
-
-            return {
-                "action": "wait",
-                "message": f"Waiting {wait_time}s before retry (exponential backoff)",
-                "wait_seconds": wait_time,
-            }
-
-        elif strategy == RetryStrategy.INCREASE_TIMEOUT:
-            timeout_config = self.strategies.get("timeout", {})
-            multiplier = timeout_config.get("timeout_multiplier", 1.5)
-            current_timeout = context.get("timeout", 30)
-            new_timeout = int(current_timeout * multiplier)
-
-            return {
-                "action": "retry",
-                "message": f"Increasing timeout to {new_timeout}s",
-                "new_timeout": new_timeout,
-            }
-
-        elif strategy == RetryStrategy.WAIT_AND_RETRY:
-            retry_after = error.get("details", {}).get("retry_after_seconds", 5)
-            return {
-                "action": "wait",
-                "message": f"Waiting {retry_after}s before retry",
-                "wait_seconds": retry_after,
-            }
-
-        else:  # REPORT_AND_ASK
-            return {
-                "action": "ask_user",
-                "message": "Need user input to proceed",
-                "error": error,
-                "suggestions": error.get("suggestions", []),
-            }
+        return self._handlers.get(strategy, self._report_and_ask)(error, context)
+
+    def _request_approval(self, error: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Ask the user to approve the operation."""
+        return {
+            "action": "request_approval",
+            "message": "Requesting user approval",
+            "resource": context.get("resource"),
+            "operation": context.get("operation"),
+            "suggestions": error.get("suggestions", []),
+        }
+
+    def _search_alternatives(self, error: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Search for an alternative resource."""
+        return {
+            "action": "search",
+            "message": "Searching for alternatives",
+            "pattern": context.get("pattern"),
+            "suggestions": error.get("suggestions", []),
+        }
+
+    def _fix_and_retry(self, error: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Fix the reported issue and retry."""
+        return {
+            "action": "fix",
+            "message": "Attempting to fix the issue",
+            "error_details": error.get("details", {}),
+            "suggestions": error.get("suggestions", []),
+        }
+
+    def _exponential_backoff(self, error: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Wait exponentially longer after each retry."""
+        retry_count = self.retry_counts.get(context.get("operation_id", ""), 0)
+        wait_time = self._backoff_table[min(retry_count, len(self._backoff_table) - 1)]
+
+        return {
+            "action": "wait",
+            "message": f"Waiting {wait_time}s before retry (exponential backoff)",
+            "wait_seconds": wait_time,
+        }
+
+    def _increase_timeout(self, error: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Retry with a longer timeout."""
+        timeout_config = self.strategies.get("timeout", {})
+        multiplier = timeout_config.get("timeout_multiplier", 1.5)
+        current_timeout = context.get("timeout", 30)
+        new_timeout = int(current_timeout * multiplier)
+
+        return {
+            "action": "retry",
+            "message": f"Increasing timeout to {new_timeout}s",
+            "new_timeout": new_timeout,
+        }
+
+    def _wait_and_retry(self, error: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Wait for the time the error asks for, then retry."""
+        retry_after = error.get("details", {}).get("retry_after_seconds", 5)
+        return {
+            "action": "wait",
+            "message": f"Waiting {retry_after}s before retry",
+            "wait_seconds": retry_after,
+        }
+
+    def _report_and_ask(self, error: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Report the error and ask the user how to proceed."""
+        return {
+            "action": "ask_user",
+            "message": "Need user input to proceed",
+            "error": error,
+            "suggestions": error.get("suggestions", []),
+        }
 
     def reset_retry_count(self, operation_id: str) -> None:
         """Reset retry count for an operation."""
@@ -0,0 +1,83 @@
+"""JSON helpers using orjson when available, with a stdlib fallback."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Parse JSON text.
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        ValueError: If data is not valid JSON (both orjson and json errors subclass it)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes (non-ASCII kept as-is).
+
+    Args:
+        obj: Python object to serialize
+        indent: Pretty-print with 2-space indentation instead of compact output
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            # orjson rejects some types json handles (e.g. int subclasses, huge ints)
+            pass
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_key(obj: Any) -> str:
+    """
+    Serialize to canonical compact JSON for use as a lookup key.
+
+    Keys are sorted, so equal dicts give equal text, and values JSON can't
+    represent are converted with str().
+
+    Args:
+        obj: Python object to serialize
+
+    Returns:
+        JSON text
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize to compact JSON (no indentation, non-ASCII kept as-is).
+
+    Args:
+        obj: Python object to serialize
+
+    Returns:
+        JSON text
+    """
+    return dumps_bytes(obj).decode()
@@ -1,10 +1,13 @@
 """Ollama client integration."""
 
 import json
-from typing import Any, Dict, List, Optional, AsyncIterator
-import ollama
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple, AsyncIterator
 from agent.prompts.system_prompt import SYSTEM_PROMPTS
 
+# Seconds a list_models() result is reused before asking Ollama again
+_MODELS_TTL = 5.0
+
 
 class OllamaClient:
     """Client for interacting with Ollama models."""
@@ -20,6 +23,20 @@ class OllamaClient:
         self.agent_config = config.get("agent", {})
         self.base_url = self.config.get("base_url", "http://localhost:11434")
 
+        # Imported here: ollama pulls in httpx and pydantic, which startup
+        # paths that never talk to the model shouldn't pay for
+        import ollama
+
+        # Persistent clients (and keep-alive connection pools) for all calls:
+        # the async one for coroutines, the sync one for the generator APIs
+        timeout = self.config.get("timeout", 120)
+        self._client = ollama.Client(host=self.base_url, timeout=timeout)
+        self._async_client = ollama.AsyncClient(host=self.base_url, timeout=timeout)
+        # Keep the model (and its prompt-prefix KV cache) loaded between requests
+        self.keep_alive = self.config.get("keep_alive", "30m")
+        # (time fetched, model names) from the last successful list_models()
+        self._models_cache: Optional[Tuple[float, List[str]]] = None
+
         # Auto-discover models and set current model
         available_models = self.list_models()
 
@@ -82,16 +99,13 @@ class OllamaClient:
         options: Dict[str, Any],
     ) -> Dict[str, Any]:
         """Generate full response (non-streaming)."""
-        import asyncio
-
         try:
-            # Properly wrap synchronous ollama.generate() in thread pool
-            response = await asyncio.to_thread(
-                ollama.generate,
+            response = await self._async_client.generate(
                 model=model,
                 prompt=prompt,
                 system=system,
                 options=options,
+                keep_alive=self.keep_alive,
             )
             if isinstance(response, dict):
                 return response
@@ -109,15 +123,16 @@ class OllamaClient:
     ) -> AsyncIterator[str]:
         """Generate streaming response."""
         try:
-            stream = ollama.generate(
+            stream = await self._async_client.generate(
                 model=model,
                 prompt=prompt,
                 system=system,
                 options=options,
                 stream=True,
+                keep_alive=self.keep_alive,
             )
 
-            for chunk in stream:
+            async for chunk in stream:
                 if "response" in chunk:
                     yield chunk["response"]
 
@@ -143,8 +158,6 @@ class OllamaClient:
         Returns:
             Chat response
         """
-        import asyncio
-
         model = model or self.current_model
         temperature = temperature if temperature is not None else self.config.get("temperature", 0.7)
 
@@ -158,13 +171,13 @@ class OllamaClient:
                 "model": model,
                 "messages": messages,
                 "options": options,
+                "keep_alive": self.keep_alive,
             }
 
             if tools:
                 kwargs["tools"] = tools
 
-            # Properly wrap synchronous ollama.chat() in thread pool
-            response = await asyncio.to_thread(ollama.chat, **kwargs)
+            response = await self._async_client.chat(**kwargs)
             return response
 
         except Exception as e:
@@ -203,11 +216,12 @@ class OllamaClient:
         }
 
         try:
-            stream = ollama.chat(
+            stream = self._client.chat(
                 model=model,
                 messages=messages,
                 options=options,
                 stream=True,
+                keep_alive=self.keep_alive,
             )
 
             for chunk in stream:
@@ -219,10 +233,185 @@ class OllamaClient:
         except Exception as e:
             yield f"Error in streaming chat: {str(e)}"
 
-    def list_models(self) -> List[str]:
-        """List available Ollama models dynamically from Ollama API."""
+    def chat_stream_bytes(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> Iterator[bytes]:
+        """
+        Like chat_stream(), but yields UTF-8 encoded chunks.
+
+        For sinks that write bytes (files, sockets), which can then collect
+        the reply in a bytearray and decode it once at the end of the turn.
+
+        Args:
+            messages: List of chat messages
+            model: Model name
+            temperature: Temperature for generation
+
+        Yields:
+            Encoded text chunks as they arrive
+        """
+        for chunk in self.chat_stream(messages, model, temperature):
+            yield chunk.encode()
+
+    def chat_stream_message(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        Chat with Ollama model using streaming, keeping tool calls.
+        Note: ollama library is synchronous, so this is a regular generator.
+
+        Args:
+            messages: List of chat messages
+            model: Model name
+            temperature: Temperature for generation
+            tools: List of available tools for function calling
+
+        Yields:
+            Partial assistant messages (content and/or tool_calls), or
+            {"error": ...} if the request fails
+        """
+        model = model or self.current_model
+        temperature = temperature if temperature is not None else self.config.get("temperature", 0.7)
+
+        options = {
+            "temperature": temperature,
+            "top_p": self.config.get("top_p", 0.9),
+        }
+
+        try:
+            kwargs = {
+                "model": model,
+                "messages": messages,
+                "options": options,
+                "stream": True,
+                "keep_alive": self.keep_alive,
+            }
+
+            if tools:
+                kwargs["tools"] = tools
+
+            for chunk in self._client.chat(**kwargs):
+                if "message" in chunk:
+                    yield chunk["message"]
+
+        except Exception as e:
+            yield {"error": str(e)}
+
+    async def chat_stream_async(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Async version of chat_stream() that doesn't block the event loop.
+
+        Args:
+            messages: List of chat messages
+            model: Model name
+            temperature: Temperature for generation
+
+        Yields:
+            Text chunks as they arrive
+        """
+        model = model or self.current_model
+        temperature = temperature if temperature is not None else self.config.get("temperature", 0.7)
+
+        options = {
+            "temperature": temperature,
+            "top_p": self.config.get("top_p", 0.9),
+        }
+
+        try:
+            stream = await self._async_client.chat(
+                model=model,
+                messages=messages,
+                options=options,
+                stream=True,
+                keep_alive=self.keep_alive,
+            )
+
+            async for chunk in stream:
+                if "message" in chunk:
+                    content = chunk["message"].get("content", "")
+                    if content:
+                        yield content
+
+        except Exception as e:
+            yield f"Error in streaming chat: {str(e)}"
+
+    async def chat_stream_message_async(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of chat_stream_message() that doesn't block the event loop.
+
+        Args:
+            messages: List of chat messages
+            model: Model name
+            temperature: Temperature for generation
+            tools: List of available tools for function calling
+
+        Yields:
+            Partial assistant messages, or {"error": ...} if the request fails
+        """
+        model = model or self.current_model
+        temperature = temperature if temperature is not None else self.config.get("temperature", 0.7)
+
+        options = {
+            "temperature": temperature,
+            "top_p": self.config.get("top_p", 0.9),
+        }
+
         try:
-            response = ollama.list()
+            kwargs = {
+                "model": model,
+                "messages": messages,
+                "options": options,
+                "stream": True,
+                "keep_alive": self.keep_alive,
+            }
+
+            if tools:
+                kwargs["tools"] = tools
+
+            async for chunk in await self._async_client.chat(**kwargs):
+                if "message" in chunk:
+                    yield chunk["message"]
+
+        except Exception as e:
+            yield {"error": str(e)}
+
+    def list_models(self, force: bool = False) -> List[str]:
+        """
+        List available Ollama models dynamically from Ollama API.
+
+        The result is reused for a few seconds so repeated calls don't each
+        cost an HTTP roundtrip.
+
+        Args:
+            force: Ignore the cached list and ask Ollama again
+
+        Returns:
+            Sorted model names (empty if Ollama can't be reached)
+        """
+        cached = self._models_cache
+        if not force and cached and time.monotonic() - cached[0] < _MODELS_TTL:
+            return list(cached[1])
+
+        try:
+            response = self._client.list()
             models_list = response.get("models", [])
 
             # Extract model names - try both "name" and "model" keys
@@ -233,7 +422,9 @@ class OllamaClient:
                 if name:
                     model_names.append(name)
 
-            return sorted(model_names)  # Sort for better UX
+            model_names.sort()  # Sort for better UX
+            self._models_cache = (time.monotonic(), model_names)
+            return list(model_names)
         except Exception as e:
             print(f"Error listing models from Ollama: {e}")
             print(f"Make sure Ollama is running: ollama serve")
@@ -249,17 +440,27 @@ class OllamaClient:
         Returns:
             True if successful
         """
-        available_models = self.list_models()
-        if model_name in available_models:
+        # Models pulled since the cached list was fetched need a refresh
+        if model_name in self.list_models() or model_name in self.list_models(force=True):
             self.current_model = model_name
             return True
         return False
 
+    async def close(self) -> None:
+        """Close the persistent HTTP connection pools."""
+        # ollama < 0.5 has no close() on its clients; close their httpx clients
+        http_client = getattr(self._client, "_client", None)
+        if http_client is not None:
+            http_client.close()
+        async_http_client = getattr(self._async_client, "_client", None)
+        if async_http_client is not None:
+            await async_http_client.aclose()
+
     def get_current_model(self) -> str:
         """Get current model name."""
         return self.current_model
 
-    async def extract_tool_calls(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def extract_tool_calls(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Extract tool calls from response.
 
@@ -269,15 +470,11 @@ class OllamaClient:
         Returns:
             List of tool calls
         """
-        message = response.get("message", {})
-        tool_calls = message.get("tool_calls", [])
-
-        # Parse tool calls
-        parsed_calls = []
-        for tool_call in tool_calls:
-            parsed_calls.append({
+        tool_calls = response.get("message", {}).get("tool_calls") or ()
+        return [
+            {
                 "tool": tool_call.get("function", {}).get("name"),
                 "arguments": tool_call.get("function", {}).get("arguments", {}),
-            })
-
-        return parsed_calls
+            }
+            for tool_call in tool_calls
+        ]
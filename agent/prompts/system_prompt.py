@@ -1,6 +1,10 @@
 """System prompts for the agent."""
 
-SYSTEM_PROMPTS = {
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+SYSTEM_PROMPTS: Mapping[str, str] = MappingProxyType({
     "main": """You are Claude Code, an expert AI software engineer and coding assistant with comprehensive tool access.
 
 ## Core Capabilities
@@ -64,6 +68,7 @@ You are helpful, intelligent, and efficient. Think like an expert engineer.""",
 4. Anticipate potential issues
 
 Keep the plan concise and actionable.
+If no tools are needed to answer, reply with exactly: NO_ACTION_NEEDED
 """,
     "system_act": """Execute the planned actions:
 - Use the appropriate tools
@@ -87,9 +92,10 @@ If a tool fails, note the error for the next phase.
 - Identify gaps in knowledge
 - Provide actionable insights
 """,
-}
+})
 
 
+@lru_cache(maxsize=None)
 def get_system_prompt(prompt_type: str = "main") -> str:
     """
     Get system prompt by type.
@@ -1,44 +1,151 @@
 """Tool executor for MCP tools."""
 
+import asyncio
+import importlib.util
+import time
 import httpx
-import json
-from typing import Any, Dict, List, Optional
+from contextlib import AsyncExitStack
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from mcp.client.session import ClientSession
 from mcp.client.sse import sse_client
+from agent import json_utils
 
 # Expose aconnect_sse alias to allow tests to patch the SSE connector
 aconnect_sse = sse_client
 
+# Ask caches and proxies between us and the server not to hold back events
+_SSE_HEADERS = {"Cache-Control": "no-cache"}
+
+# Tools assumed to exist when the server can't be asked
+_FALLBACK_TOOLS = (
+    "read_file",
+    "write_file",
+    "edit_file",
+    "list_directory",
+    "grep",
+    "glob",
+    "find",
+    "bash",
+    "get_job_status",
+    "kill_job",
+    "web_fetch",
+    "web_search",
+)
+_FALLBACK_TOOLS_SET = frozenset(_FALLBACK_TOOLS)
+
 
 class ToolExecutor:
     """Executor for MCP tools via MCP SSE protocol."""
 
-    def __init__(self, mcp_server_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        mcp_server_url: str = "http://localhost:8000",
+        max_connections: int = 32,
+        timeout: float = 600.0,
+    ):
         """
         Initialize tool executor.
 
         Args:
             mcp_server_url: URL of the MCP server
+            max_connections: Maximum concurrent connections to the MCP server
+            timeout: Seconds to wait for a tool result (the default covers
+                the longest bash timeout the server allows)
         """
         self.mcp_server_url = mcp_server_url.rstrip("/")
+        self._sse_url = f"{self.mcp_server_url}/sse"
+        self._tools_url = f"{self.mcp_server_url}/tools"
+        self.timeout = timeout
+        # One MCP session reused by all tool calls. It lives in its own task
+        # (the SSE client's task group must be exited by the task that entered
+        # it), which holds it open until _closing is set
         self.session: Optional[ClientSession] = None
-        self._initialized = False
-        # HTTP client used for simple REST endpoints (and tests)
-        self.client: httpx.AsyncClient = httpx.AsyncClient(base_url=self.mcp_server_url)
+        self._session_lock = asyncio.Lock()
+        self._session_task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        # HTTP client used for simple REST endpoints (and tests); one pooled
+        # client whose idle connections stay open between agent turns.
+        # HTTP/2 only helps over TLS (httpx doesn't do cleartext h2c) and
+        # needs the optional h2 package
+        self.client: httpx.AsyncClient = httpx.AsyncClient(
+            base_url=self.mcp_server_url,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            http2=self.mcp_server_url.startswith("https://") and importlib.util.find_spec("h2") is not None,
+        )
+        # Caps concurrent tool calls so parallel dispatch doesn't flood the server
+        self._call_slots = asyncio.Semaphore(max_connections)
+
+        # (time fetched, tool names) from the last successful list_tools()
+        self._tools_cache: Optional[Tuple[float, List[str]]] = None
+        self._tools_ttl = 30.0
+        # Set of the cached tool names, for has_tool()
+        self._tools_set: Optional[FrozenSet[str]] = None
+
+    async def _ensure_initialized(self) -> ClientSession:
+        """
+        Ensure MCP session is initialized.
+
+        Returns:
+            The shared MCP session
+
+        Raises:
+            Exception: If the server can't be reached or the handshake fails
+        """
+        async with self._session_lock:
+            if self.session is None:
+                ready = asyncio.get_running_loop().create_future()
+                self._closing = asyncio.Event()
+                self._session_task = asyncio.create_task(self._run_session(ready, self._closing))
+                try:
+                    self.session = await ready
+                except Exception as e:
+                    self._session_task = None
+                    raise Exception(f"Failed to initialize MCP client: {e}")
+            return self.session
+
+    async def _run_session(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        """
+        Open the SSE connection and MCP session and hold them until closing is set.
+
+        Args:
+            ready: Resolved with the initialized session (or the connection error)
+            closing: Set to close the session
+        """
+        session = None
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(
+                    aconnect_sse(url=self._sse_url, headers=_SSE_HEADERS)
+                )
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                ready.set_result(session)
+                await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+        finally:
+            if not ready.done():
+                ready.set_exception(ConnectionError("MCP session closed before initializing"))
+            # A dropped connection ends the task; the next call reconnects
+            if session is not None and self.session is session:
+                self.session = None
 
-    async def _ensure_initialized(self):
-        """Ensure MCP session is initialized."""
-        if not self._initialized:
+    async def _reset_session(self) -> None:
+        """Close the shared MCP session, if one is open."""
+        self.session = None
+        task, self._session_task = self._session_task, None
+        if task is not None:
+            self._closing.set()
             try:
-                # Create SSE client and session
-                client_params = sse_client(url=f"{self.mcp_server_url}/sse")
-                async with client_params as (read, write):
-                    async with ClientSession(read, write) as session:
-                        await session.initialize()
-                        self.session = session
-                        self._initialized = True
-            except Exception as e:
-                raise Exception(f"Failed to initialize MCP client: {e}")
+                await task
+            except Exception:
+                pass
 
     async def execute_tool(
         self,
@@ -56,51 +163,60 @@ class ToolExecutor:
             Tool execution result
         """
         try:
-            # Connect to MCP server SSE stream and execute tool
-            client_ctx = aconnect_sse(url=f"{self.mcp_server_url}/sse")
-            async with client_ctx as (read, write):
-                # Create and initialize session
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    
-                    # Execute the tool through session
-                    result = await session.call_tool(tool_name, arguments)
-                    
-                    # Parse MCP CallToolResult
-                    # MCP returns CallToolResult with content list
-                    if hasattr(result, 'content') and isinstance(result.content, list):
-                        # Extract text from content items
-                        content_texts = []
-                        for item in result.content:
-                            if hasattr(item, 'text'):
-                                content_texts.append(item.text)
-                        
-                        # Combine all text content
-                        combined_text = "\n".join(content_texts) if content_texts else ""
-                        
-                        # Try to parse as JSON
-                        try:
-                            result_data = json.loads(combined_text)
-                        except (json.JSONDecodeError, ValueError):
-                            # If not JSON, return as text
-                            result_data = {"content": combined_text}
-                    else:
-                        # Fallback for other result formats
-                        result_data = {"content": str(result)}
-                    
-                    return {
-                        "tool": tool_name,
-                        "arguments": arguments,
-                        "result": result_data,
-                        "success": True,
-                    }
-
-            # If no result event received
+            async with self._call_slots:
+                session = await self._ensure_initialized()
+                try:
+                    # Execute the tool through the shared session. The SSE
+                    # reader hands events over unbuffered, so a stalled call
+                    # holds no queue, only this wait; the timeout bounds it
+                    result = await asyncio.wait_for(
+                        session.call_tool(tool_name, arguments), timeout=self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    # Only this request is abandoned; the session stays usable
+                    raise TimeoutError(f"no result after {self.timeout}s")
+                except Exception:
+                    # Transport/protocol failure: reconnect on the next call
+                    if self.session is session:
+                        await self._reset_session()
+                    raise
+
+            # Parse MCP CallToolResult
+            structured = getattr(result, 'structuredContent', None)
+            if isinstance(structured, dict):
+                # The server already sent the result as an object
+                result_data = structured
+            # MCP returns CallToolResult with content list
+            elif hasattr(result, 'content') and isinstance(result.content, list):
+                # Extract text from content items
+                content_texts = [item.text for item in result.content if hasattr(item, 'text')]
+
+                # Combine all text content; tools almost always send a single
+                # item, which is parsed as-is without building a new string
+                if len(content_texts) == 1:
+                    combined_text = content_texts[0]
+                else:
+                    combined_text = "\n".join(content_texts)
+
+                # Try to parse as JSON, if it can be an object or array
+                result_data = None
+                if combined_text.startswith(("{", "[")):
+                    try:
+                        result_data = json_utils.loads(combined_text)
+                    except ValueError:
+                        pass
+                if result_data is None:
+                    # If not JSON, return as text
+                    result_data = {"content": combined_text}
+            else:
+                # Fallback for other result formats
+                result_data = {"content": str(result)}
+
             return {
                 "tool": tool_name,
                 "arguments": arguments,
-                "result": None,
-                "success": False,
+                "result": result_data,
+                "success": True,
             }
 
         except Exception as e:
@@ -111,42 +227,82 @@ class ToolExecutor:
                 "success": False,
             }
 
+    async def execute_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Execute several independent MCP tools at once.
+
+        The calls are pipelined over the shared session (the MCP client
+        matches responses to requests by id), so N calls cost one
+        connection and roughly one round-trip instead of N sequential ones.
+
+        Args:
+            calls: (tool name, arguments) pairs
+
+        Returns:
+            One execute_tool() result per call, in the order given
+        """
+        return list(await asyncio.gather(*[
+            self.execute_tool(tool_name, arguments) for tool_name, arguments in calls
+        ]))
+
     async def list_tools(self) -> List[str]:
         """
         List available tools from MCP server.
 
+        The server's answer is reused for _tools_ttl seconds.
+
         Returns:
             List of tool names
         """
+        now = time.monotonic()
+        if self._tools_cache and now - self._tools_cache[0] < self._tools_ttl:
+            return list(self._tools_cache[1])
+
         try:
             # Use HTTP endpoint to list tools (simpler and test-friendly)
-            resp = await self.client.get(f"{self.mcp_server_url}/tools")
+            resp = await self.client.get(self._tools_url)
             if resp.status_code == 200:
                 data = resp.json()
-                return data.get("tools", [])
+                tools = data.get("tools", [])
+                self._tools_cache = (now, tools)
+                self._tools_set = None
+                return list(tools)
             else:
                 raise Exception(f"Unexpected status: {resp.status_code}")
 
         except Exception as e:
             # Fallback to known tools if server is not available
             print(f"Warning: Could not list tools from MCP server: {e}")
-            return [
-                "read_file",
-                "write_file",
-                "edit_file",
-                "list_directory",
-                "grep",
-                "glob",
-                "find",
-                "bash",
-                "get_job_status",
-                "kill_job",
-                "web_fetch",
-                "web_search",
-            ]
+            return list(_FALLBACK_TOOLS)
+
+    def has_tool(self, name: str) -> bool:
+        """
+        Check whether a tool exists, without a request.
+
+        Uses the tools from the last successful list_tools() (or the
+        fallback list if the server hasn't answered yet).
+
+        Args:
+            name: Tool name
+
+        Returns:
+            True if the tool is known
+        """
+        if self._tools_cache is None:
+            return name in _FALLBACK_TOOLS_SET
+        if self._tools_set is None:
+            self._tools_set = frozenset(self._tools_cache[1])
+        return name in self._tools_set
+
+    def invalidate_tools_cache(self) -> None:
+        """Make the next list_tools() ask the server again (e.g. after it restarts)."""
+        self._tools_cache = None
+        self._tools_set = None
 
     async def close(self) -> None:
         """Close the MCP session."""
+        await self._reset_session()
+
         # Close HTTP client
         try:
             await self.client.aclose()
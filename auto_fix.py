@@ -7,40 +7,103 @@ Usage:
     python3 auto_fix.py
 """
 
+import glob
+import hashlib
 import os
+import re
 import sys
 import shutil
+import tempfile
+from collections import namedtuple
 from datetime import datetime
 
 
-def create_backup(file_path):
-    """Create a backup of the file."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = f"{file_path}.backup_{timestamp}"
-    shutil.copy2(file_path, backup_path)
-    return backup_path
+# One file fix: skipped when marker (bytes) is already in the file, otherwise
+# every (old, new) text replacement is applied and the modules in imports
+# are imported at the top of the file if they aren't already
+Patch = namedtuple("Patch", "name path marker marker_note replacements done imports", defaults=((),))
 
+# First top-level import statement that isn't a __future__ import
+_FIRST_IMPORT_RE = re.compile(rb"^(?:import\s|from\s+(?!__future__\b))", re.M)
 
-def fix_ollama_client():
-    """Fix 1: Add asyncio.to_thread() wrapper to ollama_client.py"""
-    file_path = "agent/ollama_client.py"
 
-    print(f"\n📝 Fixing {file_path}...")
+def create_backup(file_path, content):
+    """
+    Create a backup of the file.
 
-    # Create backup
-    backup_path = create_backup(file_path)
-    print(f"   ✓ Backup created: {backup_path}")
+    If an earlier backup already holds the same content, that one is reused
+    instead of writing another copy.
+    """
+    digest = hashlib.sha256(content).digest()
+    for existing in sorted(glob.glob(f"{glob.escape(file_path)}.backup_*")):
+        if os.path.getsize(existing) != len(content):
+            continue
+        with open(existing, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == digest:
+                return existing
 
-    with open(file_path, "r") as f:
-        content = f.read()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_path = f"{file_path}.backup_{timestamp}"
+    shutil.copy2(file_path, backup_path)
+    return backup_path
 
-    # Check if already fixed
-    if "asyncio.to_thread" in content:
-        print(f"   ⊙ Already fixed (asyncio.to_thread found)")
-        return True
 
-    # Fix 1: _generate_full method
-    old_generate = """    async def _generate_full(
+def write_atomic(file_path, content):
+    """
+    Replace the file's content atomically.
+
+    The new content goes to a temporary file in the same directory, which
+    is then renamed over the original, so an interrupted run leaves either
+    the old or the new file, never a truncated one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", prefix=".autofix_")
+    try:
+        os.write(fd, content)
+        os.close(fd)
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+        os.unlink(tmp_path)
+        raise
+
+
+def replace_patterns(content, replacements):
+    """
+    Apply (old, new) text replacements to file content kept as bytes.
+
+    Working on the raw bytes skips decoding and re-encoding the file, and
+    patterns that don't occur cost one scan and no copy.
+    """
+    for old, new in replacements:
+        old_bytes = old.encode()
+        if old_bytes in content:
+            content = content.replace(old_bytes, new.encode())
+    return content
+
+
+def ensure_imports(content, modules):
+    """
+    Add "import <module>" lines for modules the file doesn't import yet.
+
+    The lines go in front of the file's first import statement, so patched
+    code uses the module without importing it again on every call.
+    """
+    for module in modules:
+        if re.search(rb"^import " + re.escape(module.encode()) + rb"$", content, re.M):
+            continue
+        line = b"import " + module.encode() + b"\n"
+        match = _FIRST_IMPORT_RE.search(content)
+        at = match.start() if match else 0
+        content = content[:at] + line + content[at:]
+    return content
+
+
+# Fix 1: run blocking ollama calls in a thread (agent/ollama_client.py)
+OLLAMA_OLD_GENERATE = """    async def _generate_full(
         self,
         model: str,
         prompt: str,
@@ -56,7 +119,7 @@ def fix_ollama_client():
                 options=options,
             )"""
 
-    new_generate = """    async def _generate_full(
+OLLAMA_NEW_GENERATE = """    async def _generate_full(
         self,
         model: str,
         prompt: str,
@@ -64,8 +127,6 @@ def fix_ollama_client():
         options: Dict[str, Any],
     ) -> Dict[str, Any]:
         \"\"\"Generate full response (non-streaming).\"\"\"
-        import asyncio
-
         try:
             # Properly wrap synchronous ollama.generate() in thread pool
             response = await asyncio.to_thread(
@@ -76,107 +137,29 @@ def fix_ollama_client():
                 options=options,
             )"""
 
-    content = content.replace(old_generate, new_generate)
-
-    # Fix 2: chat method
-    old_chat = """            if tools:
+OLLAMA_OLD_CHAT = """            if tools:
                 kwargs["tools"] = tools
 
             response = ollama.chat(**kwargs)
             return response"""
 
-    new_chat = """            if tools:
+OLLAMA_NEW_CHAT = """            if tools:
                 kwargs["tools"] = tools
 
             # Properly wrap synchronous ollama.chat() in thread pool
             response = await asyncio.to_thread(ollama.chat, **kwargs)
             return response"""
 
-    content = content.replace(old_chat, new_chat)
-
-    # Add import at the top of chat method if not there
-    if "import asyncio" not in content.split("async def chat(")[1].split("try:")[0]:
-        old_chat_start = """    async def chat(
-        self,
-        messages: List[Dict[str, str]],
-        model: Optional[str] = None,
-        temperature: Optional[float] = None,
-        tools: Optional[List[Dict[str, Any]]] = None,
-    ) -> Dict[str, Any]:
-        \"\"\"
-        Chat with Ollama model.
-
-        Args:
-            messages: List of chat messages
-            model: Model name
-            temperature: Temperature for generation
-            tools: List of available tools for function calling
-
-        Returns:
-            Chat response
-        \"\"\"
-        model = model or self.current_model"""
 
-        new_chat_start = """    async def chat(
-        self,
-        messages: List[Dict[str, str]],
-        model: Optional[str] = None,
-        temperature: Optional[float] = None,
-        tools: Optional[List[Dict[str, Any]]] = None,
-    ) -> Dict[str, Any]:
-        \"\"\"
-        Chat with Ollama model.
-
-        Args:
-            messages: List of chat messages
-            model: Model name
-            temperature: Temperature for generation
-            tools: List of available tools for function calling
-
-        Returns:
-            Chat response
-        \"\"\"
-        import asyncio
-
-        model = model or self.current_model"""
-
-        content = content.replace(old_chat_start, new_chat_start)
-
-    # Write updated content
-    with open(file_path, "w") as f:
-        f.write(content)
-
-    print(f"   ✓ Fixed: Added asyncio.to_thread() wrapper")
-    return True
-
-
-def fix_agent_core():
-    """Fix 2: Add timeout and debug logging to agent_core.py"""
-    file_path = "agent/agent_core.py"
-
-    print(f"\n📝 Fixing {file_path}...")
-
-    # Create backup
-    backup_path = create_backup(file_path)
-    print(f"   ✓ Backup created: {backup_path}")
-
-    with open(file_path, "r") as f:
-        content = f.read()
-
-    # Check if already fixed
-    if 'print(f"[DEBUG] Calling ollama.chat()' in content:
-        print(f"   ⊙ Already fixed (debug logging found)")
-        return True
-
-    # Fix: Add timeout and debug logging
-    old_code = """            if self.verbose:
+# Fix 2: timeout and debug logging around the tool-selection call (agent/agent_core.py)
+AGENT_CORE_OLD = """            if self.verbose:
                 print("\\n[Agent] Analyzing request and selecting tools...")
 
             # Make single chat call with tools
             messages = self.context.get_messages_for_llm()
             response = await self.ollama.chat(messages, tools=tools if tools else None)"""
 
-    new_code = """            if self.verbose:
+AGENT_CORE_NEW = """            if self.verbose:
                 print("\\n[Agent] Analyzing request and selecting tools...")
                 print(f"[Agent] Available tools: {len(tools) if tools else 0}")
                 print(f"[Agent] Current model: {self.ollama.current_model}")
@@ -203,41 +186,14 @@ def fix_agent_core():
                 print(f"\\n[Agent] LLM call timed out after {timeout}s - falling back to direct mode")
                 return await self._direct_response(user_message)"""
 
-    content = content.replace(old_code, new_code)
-
-    # Write updated content
-    with open(file_path, "w") as f:
-        f.write(content)
-
-    print(f"   ✓ Fixed: Added timeout and debug logging")
-    return True
-
-
-def fix_config():
-    """Fix 3: Add timeout configuration to agent_config.yaml"""
-    file_path = "config/agent_config.yaml"
-
-    print(f"\n📝 Fixing {file_path}...")
-
-    # Create backup
-    backup_path = create_backup(file_path)
-    print(f"   ✓ Backup created: {backup_path}")
-
-    with open(file_path, "r") as f:
-        content = f.read()
-
-    # Check if already fixed
-    if "llm_timeout:" in content:
-        print(f"   ⊙ Already fixed (llm_timeout found)")
-        return True
 
-    # Fix: Add timeout configuration
-    old_config = """  # Enable streaming for faster responses (like ollama run)
+# Fix 3: timeout settings (config/agent_config.yaml)
+CONFIG_OLD = """  # Enable streaming for faster responses (like ollama run)
   stream_responses: true
 
   # Token management"""
 
-    new_config = """  # Enable streaming for faster responses (like ollama run)
+CONFIG_NEW = """  # Enable streaming for faster responses (like ollama run)
   stream_responses: true
 
   # Timeout for LLM calls in seconds (prevents infinite hangs)
@@ -248,73 +204,95 @@ def fix_config():
 
   # Token management"""
 
-    content = content.replace(old_config, new_config)
-
-    # Write updated content
-    with open(file_path, "w") as f:
-        f.write(content)
-
-    print(f"   ✓ Fixed: Added timeout configuration")
-    return True
-
 
-def fix_context_manager():
-    """Fix 4: Allow 'tool' role messages in context_manager.py"""
-    file_path = "agent/context_manager.py"
-
-    print(f"\n📝 Fixing {file_path}...")
-
-    # Create backup
-    backup_path = create_backup(file_path)
-    print(f"   ✓ Backup created: {backup_path}")
-
-    with open(file_path, "r") as f:
-        content = f.read()
-
-    # Check if already fixed
-    if '"tool"' in content and 'if msg["role"] in ["user", "assistant", "system", "tool"]' in content:
-        print(f"   ⊙ Already fixed ('tool' role already included)")
-        return True
-
-    # Fix: Add "tool" to allowed roles
-    old_code = '''        return [
+# Fix 4: keep 'tool' role messages (agent/context_manager.py)
+CONTEXT_MANAGER_OLD = '''        return [
             {"role": msg["role"], "content": msg["content"]}
             for msg in self.messages
             if msg["role"] in ["user", "assistant", "system"]
         ]'''
 
-    new_code = '''        return [
+CONTEXT_MANAGER_NEW = '''        return [
             {"role": msg["role"], "content": msg["content"]}
             for msg in self.messages
             if msg["role"] in ["user", "assistant", "system", "tool"]
         ]'''
 
-    if old_code in content:
-        content = content.replace(old_code, new_code)
-    else:
+PATCHES = (
+    Patch(
+        name="Async Wrapper (ollama_client.py)",
+        path="agent/ollama_client.py",
+        marker=b"asyncio.to_thread",
+        marker_note="asyncio.to_thread found",
+        replacements=(
+            (OLLAMA_OLD_GENERATE, OLLAMA_NEW_GENERATE),
+            (OLLAMA_OLD_CHAT, OLLAMA_NEW_CHAT),
+        ),
+        done="Added asyncio.to_thread() wrapper",
+        imports=("asyncio",),
+    ),
+    Patch(
+        name="Timeout & Debug Logging (agent_core.py)",
+        path="agent/agent_core.py",
+        marker=b'print(f"[DEBUG] Calling ollama.chat()',
+        marker_note="debug logging found",
+        replacements=((AGENT_CORE_OLD, AGENT_CORE_NEW),),
+        done="Added timeout and debug logging",
+        imports=("asyncio",),
+    ),
+    Patch(
+        name="Config Timeout (agent_config.yaml)",
+        path="config/agent_config.yaml",
+        marker=b"llm_timeout:",
+        marker_note="llm_timeout found",
+        replacements=((CONFIG_OLD, CONFIG_NEW),),
+        done="Added timeout configuration",
+    ),
+    Patch(
+        name="Tool Role Messages (context_manager.py)",
+        path="agent/context_manager.py",
+        marker=b'if msg["role"] in ["user", "assistant", "system", "tool"]',
+        marker_note="'tool' role already included",
+        replacements=((CONTEXT_MANAGER_OLD, CONTEXT_MANAGER_NEW),),
+        done="Added 'tool' role to allowed messages",
+    ),
+)
+
+
+def apply_patch(patch):
+    """Apply one Patch, backing the file up first. Returns True on success."""
+    print(f"\n📝 Fixing {patch.path}...")
+
+    with open(patch.path, "rb") as f:
+        content = f.read()
+
+    # Check if already fixed
+    if patch.marker in content:
+        print(f"   ⊙ Already fixed ({patch.marker_note})")
+        return True
+
+    patched = replace_patterns(content, patch.replacements)
+    if patched == content:
         print(f"   ⚠ Warning: Could not find exact pattern to replace")
-        print(f"   Manual fix may be needed - add 'tool' to allowed roles in get_messages_for_llm()")
+        print(f"   Manual fix may be needed - see LOCAL_MACHINE_FIXES.md")
         return False
+    patched = ensure_imports(patched, patch.imports)
+
+    # Create backup (only now that the file is about to change)
+    backup_path = create_backup(patch.path, content)
+    print(f"   ✓ Backup created: {backup_path}")
 
     # Write updated content
-    with open(file_path, "w") as f:
-        f.write(content)
+    write_atomic(patch.path, patched)
 
-    print(f"   ✓ Fixed: Added 'tool' role to allowed messages")
+    print(f"   ✓ Fixed: {patch.done}")
     return True
 
 
 def verify_files_exist():
     """Verify required files exist."""
-    required_files = [
-        "agent/ollama_client.py",
-        "agent/agent_core.py",
-        "agent/context_manager.py",
-        "config/agent_config.yaml",
-    ]
-
     missing = []
-    for file_path in required_files:
+    for file_path in (patch.path for patch in PATCHES):
         if not os.path.exists(file_path):
             missing.append(file_path)
 
@@ -342,23 +320,15 @@ def main():
     print("\n✓ All required files found")
 
     # Apply fixes
-    fixes = [
-        ("Async Wrapper (ollama_client.py)", fix_ollama_client),
-        ("Timeout & Debug Logging (agent_core.py)", fix_agent_core),
-        ("Config Timeout (agent_config.yaml)", fix_config),
-        ("Tool Role Messages (context_manager.py)", fix_context_manager),
-    ]
-
     results = []
-    for fix_name, fix_func in fixes:
+    for patch in PATCHES:
         try:
-            result = fix_func()
-            results.append((fix_name, result))
+            results.append((patch.name, apply_patch(patch)))
         except Exception as e:
-            print(f"\n   ✗ Error applying {fix_name}: {e}")
+            print(f"\n   ✗ Error applying {patch.name}: {e}")
             import traceback
             traceback.print_exc()
-            results.append((fix_name, False))
+            results.append((patch.name, False))
 
     # Summary
     print("\n" + "=" * 70)
@@ -1,13 +1,98 @@
 """Slash command handlers."""
 
-from typing import Any, Dict, Callable, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 import yaml
 from pathlib import Path
+from rich.markdown import Markdown
+from rich.table import Table
+from rich.text import Text
+
+_HELP_TEXT = """
+# Available Commands
+
+- `/help` - Show this help message
+- `/model [name]` - Switch Ollama model or list available models
+- `/agent on|off` - Toggle agent mode
+- `/tools` - List available MCP tools
+- `/config [key]` - Show configuration
+- `/history [limit]` - View conversation history
+- `/clear` - Clear conversation history
+- `/save [file]` - Save conversation to file
+- `/load [file]` - Load conversation from file
+- `/permissions` - View/manage permissions
+- `/retry` - Retry last failed operation
+- `/exit` or `/quit` - Exit the application
+
+## Examples
+
+```
+/model deepseek-r1:1.5b
+/agent on
+/tools
+/save my_conversation.json
+```
+"""
+
+_PERMISSIONS_TEXT = """
+# Permission System
+
+Current permission mode: moderate
+
+## Safe Directories
+- /home/ec2-user/environment
+
+## Blocked Directories
+- /root, /sys, /proc, /boot, /dev
+
+Use configuration files to modify permissions.
+"""
+
+# Static command output, parsed once instead of on every command
+_HELP_MD = Markdown(_HELP_TEXT)
+_PERMISSIONS_MD = Markdown(_PERMISSIONS_TEXT)
+
+# Marks a config key that doesn't exist (None is a valid config value)
+_MISSING = object()
+
+
+def _clip(text: str, limit: int = 100) -> str:
+    """
+    Shorten text to about limit characters, keeping its start and end.
+
+    Args:
+        text: Text to shorten
+        limit: Number of characters kept
+
+    Returns:
+        text itself if short enough, else its head and tail around "…"
+    """
+    if len(text) <= limit:
+        return text
+    head = limit // 2
+    return f"{text[:head]}…{text[head - limit:]}"
 
 
 class CommandHandler:
     """Handles slash commands."""
 
+    # Command name -> handler method name, shared by all instances
+    _COMMANDS: Mapping[str, str] = MappingProxyType({
+        "help": "_cmd_help",
+        "model": "_cmd_model",
+        "agent": "_cmd_agent",
+        "tools": "_cmd_tools",
+        "config": "_cmd_config",
+        "history": "_cmd_history",
+        "clear": "_cmd_clear",
+        "save": "_cmd_save",
+        "load": "_cmd_load",
+        "permissions": "_cmd_permissions",
+        "retry": "_cmd_retry",
+        "exit": "_cmd_exit",
+        "quit": "_cmd_exit",
+    })
+
     def __init__(self, agent_core: Any, config: Dict[str, Any], renderer: Any):
         """
         Initialize command handler.
@@ -20,26 +105,6 @@ class CommandHandler:
         self.agent = agent_core
         self.config = config
         self.renderer = renderer
-        self.commands: Dict[str, Callable] = {}
-        self._register_commands()
-
-    def _register_commands(self) -> None:
-        """Register all slash commands."""
-        self.commands = {
-            "help": self._cmd_help,
-            "model": self._cmd_model,
-            "agent": self._cmd_agent,
-            "tools": self._cmd_tools,
-            "config": self._cmd_config,
-            "history": self._cmd_history,
-            "clear": self._cmd_clear,
-            "save": self._cmd_save,
-            "load": self._cmd_load,
-            "permissions": self._cmd_permissions,
-            "retry": self._cmd_retry,
-            "exit": self._cmd_exit,
-            "quit": self._cmd_exit,
-        }
 
     async def execute(self, command: str, args: list[str]) -> Optional[str]:
         """
@@ -52,39 +117,15 @@ class CommandHandler:
         Returns:
             Response message or None
         """
-        if command not in self.commands:
+        method_name = self._COMMANDS.get(command)
+        if method_name is None:
             return f"Unknown command: /{command}. Type /help for available commands."
 
-        return await self.commands[command](args)
+        return await getattr(self, method_name)(args)
 
     async def _cmd_help(self, args: list[str]) -> str:
         """Show help information."""
-        help_text = """
-# Available Commands
-
-- `/help` - Show this help message
-- `/model [name]` - Switch Ollama model or list available models
-- `/agent on|off` - Toggle agent mode
-- `/tools` - List available MCP tools
-- `/config [key]` - Show configuration
-- `/history [limit]` - View conversation history
-- `/clear` - Clear conversation history
-- `/save [file]` - Save conversation to file
-- `/load [file]` - Load conversation from file
-- `/permissions` - View/manage permissions
-- `/retry` - Retry last failed operation
-- `/exit` or `/quit` - Exit the application
-
-## Examples
-
-```
-/model deepseek-r1:1.5b
-/agent on
-/tools
-/save my_conversation.json
-```
-"""
-        self.renderer.print_markdown(help_text)
+        self.renderer.print_prerendered(_HELP_MD)
         return None
 
     async def _cmd_model(self, args: list[str]) -> str:
@@ -94,12 +135,10 @@ class CommandHandler:
             models = self.agent.list_models()
             current = self.agent.get_current_model()
 
-            output = "# Available Models\n\n"
-            for model in models:
-                marker = "→" if model == current else " "
-                output += f"{marker} {model}\n"
+            parts = ["# Available Models\n\n"]
+            parts.extend(f"{'→' if model == current else ' '} {model}\n" for model in models)
 
-            self.renderer.print_markdown(output)
+            self.renderer.print_markdown("".join(parts))
             return None
 
         # Switch model
@@ -129,22 +168,23 @@ class CommandHandler:
         """List available tools."""
         tools = await self.agent.tool_executor.list_tools()
 
-        output = "# Available MCP Tools\n\n"
-        for i, tool in enumerate(tools, 1):
-            output += f"{i}. `{tool}`\n"
+        parts = ["# Available MCP Tools\n\n"]
+        parts.extend(f"{i}. `{tool}`\n" for i, tool in enumerate(tools, 1))
 
-        self.renderer.print_markdown(output)
+        self.renderer.print_markdown("".join(parts))
         return None
 
     async def _cmd_config(self, args: list[str]) -> str:
         """Show configuration."""
         if not args:
             # Show summary
-            output = "# Configuration Summary\n\n"
-            output += f"- Model: {self.agent.get_current_model()}\n"
-            output += f"- Agent Mode: {'enabled' if self.agent.is_enabled() else 'disabled'}\n"
-            output += f"- Verbose: {self.agent.verbose}\n"
-            output += f"- Max Steps: {self.agent.max_steps}\n"
+            output = (
+                "# Configuration Summary\n\n"
+                f"- Model: {self.agent.get_current_model()}\n"
+                f"- Agent Mode: {'enabled' if self.agent.is_enabled() else 'disabled'}\n"
+                f"- Verbose: {self.agent.verbose}\n"
+                f"- Max Steps: {self.agent.max_steps}\n"
+            )
 
             self.renderer.print_markdown(output)
             return None
@@ -152,33 +192,42 @@ class CommandHandler:
         # Show specific config
         key = args[0]
         value = self._get_nested_config(self.config, key.split("."))
-        if value is not None:
+        if value is not _MISSING:
             return f"{key}: {value}"
         else:
             return f"Config key not found: {key}"
 
     def _get_nested_config(self, config: Dict[str, Any], keys: list[str]) -> Any:
-        """Get nested configuration value."""
+        """Get nested configuration value (_MISSING if absent; None is a valid value)."""
         current = config
         for key in keys:
             if isinstance(current, dict) and key in current:
                 current = current[key]
             else:
-                return None
+                return _MISSING
         return current
 
     async def _cmd_history(self, args: list[str]) -> str:
         """Show conversation history."""
         limit = int(args[0]) if args else 10
-        messages = self.agent.context.get_messages(limit=limit)
-
-        output = f"# Conversation History (last {len(messages)} messages)\n\n"
+        # Roughly 3 characters per token of display budget
+        budget = 3 * self.config.get("ui", {}).get("history_max_tokens", 2000)
+        messages = self.agent.context.get_messages(limit=limit, max_chars=budget)
+
+        # One table renderable for all messages; contents are plain Text, so
+        # they aren't parsed as markdown or markup
+        table = Table(
+            title=f"Conversation History (last {len(messages)} messages)",
+            title_justify="left",
+            show_header=False,
+            box=None,
+        )
+        table.add_column(style="bold", no_wrap=True)
+        table.add_column()
         for msg in messages:
-            role = msg["role"].capitalize()
-            content = msg["content"][:100] + "..." if len(msg["content"]) > 100 else msg["content"]
-            output += f"**{role}:** {content}\n\n"
+            table.add_row(f"{msg['role'].capitalize()}:", Text(_clip(msg["content"])))
 
-        self.renderer.print_markdown(output)
+        self.renderer.print_prerendered(table)
         return None
 
     async def _cmd_clear(self, args: list[str]) -> str:
@@ -190,7 +239,8 @@ class CommandHandler:
     async def _cmd_save(self, args: list[str]) -> str:
         """Save conversation."""
         filepath = args[0] if args else None
-        saved_path = self.agent.context.save(filepath)
+        # Explicit exports are meant to be read, so indent them
+        saved_path = self.agent.context.save(filepath, pretty=filepath is not None)
         if saved_path:
             return f"Conversation saved to: {saved_path}"
         else:
@@ -209,20 +259,7 @@ class CommandHandler:
 
     async def _cmd_permissions(self, args: list[str]) -> str:
         """Show permissions info."""
-        output = """
-# Permission System
-
-Current permission mode: moderate
-
-## Safe Directories
-- /home/ec2-user/environment
-
-## Blocked Directories
-- /root, /sys, /proc, /boot, /dev
-
-Use configuration files to modify permissions.
-"""
-        self.renderer.print_markdown(output)
+        self.renderer.print_prerendered(_PERMISSIONS_MD)
         return None
 
     async def _cmd_retry(self, args: list[str]) -> str:
@@ -235,4 +272,4 @@ Use configuration files to modify permissions.
 
     def list_commands(self) -> list[str]:
         """List all available commands."""
-        return list(self.commands.keys())
+        return list(self._COMMANDS)
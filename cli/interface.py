@@ -54,12 +54,11 @@ class TerminalInterface:
 
         while self.running:
             try:
-                # Get user input
-                user_input = await asyncio.to_thread(
-                    self.session.prompt,
-                    ">>> ",
-                    style=self.style,
-                )
+                # Get user input (prompt_toolkit runs on our event loop)
+                user_input = await self.session.prompt_async(">>> ", style=self.style)
+                # prompt_toolkit took SIGWINCH while prompting, and that
+                # is when the terminal is usually resized
+                self.renderer.on_resize()
 
                 if not user_input.strip():
                     continue
@@ -82,9 +81,9 @@ class TerminalInterface:
 
     async def _handle_command(self, input_text: str) -> None:
         """Handle slash command."""
-        parts = input_text[1:].split()
-        command = parts[0] if parts else ""
-        args = parts[1:] if len(parts) > 1 else []
+        # Most commands take no arguments; only split when there are some
+        command, _, rest = input_text[1:].partition(" ")
+        args = rest.split() if rest else []
 
         result = await self.command_handler.execute(command, args)
 
@@ -121,7 +120,7 @@ class TerminalInterface:
         self.renderer.print_warning("Press Ctrl+C again to exit, or press Enter to continue")
         try:
             await asyncio.wait_for(
-                asyncio.to_thread(self.session.prompt, ""),
+                self.session.prompt_async(""),
                 timeout=3.0,
             )
             return False
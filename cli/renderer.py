@@ -1,11 +1,22 @@
 """Markdown and output rendering with Rich."""
 
+import asyncio
+import signal
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.syntax import Syntax
 from rich.panel import Panel
 from rich.text import Text
-from typing import Optional
+from typing import Any, Optional
+
+_SIGWINCH = getattr(signal, "SIGWINCH", None)
+
+# Message prefixes, styled once; the messages themselves are appended as
+# plain text so Rich doesn't parse (or mangle) brackets in them as markup
+_ERROR_PREFIX = Text("Error:", style="bold red")
+_SUCCESS_PREFIX = Text("✓", style="bold green")
+_INFO_PREFIX = Text("ℹ", style="blue")
+_WARNING_PREFIX = Text("⚠", style="yellow")
 
 
 class OutputRenderer:
@@ -22,6 +33,37 @@ class OutputRenderer:
         self.console = Console()
         self.color_scheme = color_scheme
         self.syntax_highlighting = syntax_highlighting
+        # Separator line for the current terminal width. Reading the width
+        # queries the terminal, so it's only kept when a resize can reset it
+        self._separator: Optional[str] = None
+        self._tracks_resize = self._watch_resize()
+
+    def _watch_resize(self) -> bool:
+        """
+        Reset the cached separator whenever the terminal is resized.
+
+        Returns:
+            True if a SIGWINCH handler was installed
+        """
+        if _SIGWINCH is None:
+            return False
+        try:
+            # Through the event loop when there is one: prompt_toolkit swaps
+            # its own handler in while prompting and restores loop handlers
+            # (resizes at the prompt are missed; callers use on_resize() then)
+            asyncio.get_running_loop().add_signal_handler(_SIGWINCH, self.on_resize)
+        except RuntimeError:
+            try:
+                signal.signal(_SIGWINCH, lambda signum, frame: self.on_resize())
+            except ValueError:  # not the main thread
+                return False
+        except (NotImplementedError, ValueError):
+            return False
+        return True
+
+    def on_resize(self) -> None:
+        """Drop the separator so the next one matches the (possibly) new width."""
+        self._separator = None
 
     def print_markdown(self, content: str) -> None:
         """
@@ -33,6 +75,17 @@ class OutputRenderer:
         md = Markdown(content)
         self.console.print(md)
 
+    def print_prerendered(self, renderable: Any) -> None:
+        """
+        Print a Rich renderable built ahead of time.
+
+        Used for static text whose Markdown object is parsed once.
+
+        Args:
+            renderable: Any object Rich can print
+        """
+        self.console.print(renderable)
+
     def print_code(self, code: str, language: str = "python") -> None:
         """
         Print syntax-highlighted code.
@@ -66,29 +119,29 @@ class OutputRenderer:
 
     def print_error(self, message: str) -> None:
         """Print error message."""
-        self.console.print(f"[bold red]Error:[/bold red] {message}")
+        self.console.print(Text.assemble(_ERROR_PREFIX, " ", message))
 
     def print_success(self, message: str) -> None:
         """Print success message."""
-        self.console.print(f"[bold green]✓[/bold green] {message}")
+        self.console.print(Text.assemble(_SUCCESS_PREFIX, " ", message))
 
     def print_info(self, message: str) -> None:
         """Print info message."""
-        self.console.print(f"[blue]ℹ[/blue] {message}")
+        self.console.print(Text.assemble(_INFO_PREFIX, " ", message))
 
     def print_warning(self, message: str) -> None:
         """Print warning message."""
-        self.console.print(f"[yellow]⚠[/yellow] {message}")
+        self.console.print(Text.assemble(_WARNING_PREFIX, " ", message))
 
     def print_thinking(self, message: str) -> None:
         """Print thinking/processing message."""
-        self.console.print(f"[dim]🤔 {message}[/dim]")
+        self.console.print(Text(f"🤔 {message}", style="dim"))
 
     def print_tool_execution(self, tool_name: str, status: str = "running") -> None:
         """Print tool execution status."""
         emoji = "🔧" if status == "running" else "✓"
         color = "yellow" if status == "running" else "green"
-        self.console.print(f"[{color}]{emoji} {tool_name}[/{color}]")
+        self.console.print(Text(f"{emoji} {tool_name}", style=color))
 
     def clear(self) -> None:
         """Clear the console."""
@@ -96,4 +149,9 @@ class OutputRenderer:
 
     def print_separator(self) -> None:
         """Print a separator line."""
-        self.console.print("─" * self.console.width)
+        separator = self._separator
+        if separator is None:
+            separator = "─" * self.console.width
+            if self._tracks_resize:
+                self._separator = separator
+        self.console.print(separator)
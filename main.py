@@ -1,54 +1,179 @@
 """Main entry point for Claude Agent System."""
 
 import asyncio
+import hashlib
+import os
+import pickle
 import sys
 import yaml
 from pathlib import Path
-from cli.interface import run_terminal_interface
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
+if TYPE_CHECKING:
+    import httpx
 
-def load_config(config_dir: str = "config") -> dict:
+try:
+    from platformdirs import user_cache_dir
+except ImportError:  # pragma: no cover - platformdirs is optional
+    user_cache_dir = None
+
+# (config key, file name); "agent" is merged at the top level
+CONFIG_FILES = (
+    ("agent", "agent_config.yaml"),
+    ("tools", "tools_config.yaml"),
+    ("permissions", "permissions_config.yaml"),
+)
+
+# Shared by MCP HTTP requests made from here; see _get_mcp_client()
+_mcp_client: Optional["httpx.AsyncClient"] = None
+
+# libyaml's parser when PyYAML was built with it, else the pure-Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _config_cache_dir() -> Path:
+    """Directory holding the parsed-config cache."""
+    if user_cache_dir is not None:
+        return Path(user_cache_dir("claude-agent"))
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "claude-agent"
+
+
+def _scan_config_dir(config_path: Path) -> Dict[str, Tuple[str, int, int]]:
+    """
+    Find the config files with one directory scan.
+
+    Args:
+        config_path: Directory containing config files
+
+    Returns:
+        File name -> (path, mtime, size) for each config file present
+    """
+    wanted = {filename for _, filename in CONFIG_FILES}
+    found = {}
+    try:
+        with os.scandir(config_path) as entries:
+            for entry in entries:
+                if entry.name in wanted and entry.is_file():
+                    st = entry.stat()
+                    found[entry.name] = (entry.path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        pass
+    return found
+
+
+def _parse_yaml(file_path: Path) -> Any:
+    """Read and parse one YAML file."""
+    return yaml.load(file_path.read_bytes(), Loader=_YAML_LOADER)
+
+
+async def load_config_async(config_dir: str = "config") -> dict:
     """
     Load configuration from YAML files.
 
+    The merged result is pickled to the user cache directory and reused
+    until one of the files changes (by mtime or size), which skips YAML
+    parsing on most startups. On a miss the files are read and parsed in
+    worker threads at the same time.
+
     Args:
         config_dir: Directory containing config files
 
     Returns:
         Combined configuration dictionary
     """
-    config_path = Path(config_dir)
-    config = {}
+    config_path = Path(config_dir).resolve()
+    files = _scan_config_dir(config_path)
+    # Changes whenever a config file is edited, added or removed
+    stamp = tuple(files.get(filename) for _, filename in CONFIG_FILES)
+    dir_hash = hashlib.sha256(str(config_path).encode()).hexdigest()[:16]
+    cache_file = _config_cache_dir() / f"config_{dir_hash}.pickle"
+
+    try:
+        with open(cache_file, "rb") as f:
+            cached_stamp, cached_config = pickle.load(f)
+        if cached_stamp == stamp:
+            return cached_config
+    except Exception:
+        pass
 
-    config_files = {
-        "agent": "agent_config.yaml",
-        "tools": "tools_config.yaml",
-        "permissions": "permissions_config.yaml",
-    }
+    results = await asyncio.gather(
+        *[asyncio.to_thread(_parse_yaml, Path(path)) for path, _, _ in files.values()],
+        return_exceptions=True,
+    )
+    parsed = dict(zip(files, results))
 
-    for key, filename in config_files.items():
-        file_path = config_path / filename
+    config = {}
+    complete = True
+
+    for key, filename in CONFIG_FILES:
         try:
-            with open(file_path, "r") as f:
-                loaded = yaml.safe_load(f)
-                if key == "agent":
-                    config.update(loaded)
-                else:
-                    config[key + "_config"] = loaded
+            if filename not in parsed:
+                raise FileNotFoundError(f"not found in {config_path}")
+            loaded = parsed[filename]
+            if isinstance(loaded, BaseException):
+                raise loaded
+            if key == "agent":
+                config.update(loaded)
+            else:
+                config[key + "_config"] = loaded
         except Exception as e:
+            complete = False
             print(f"Warning: Failed to load {filename}: {e}", file=sys.stderr)
 
+    # Only cache a clean load, so a broken file keeps being reported
+    if complete:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as f:
+                pickle.dump((stamp, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
     return config
 
 
+def load_config(config_dir: str = "config") -> dict:
+    """
+    Load configuration from YAML files, blocking until done.
+
+    Inside a running event loop, await load_config_async() instead.
+
+    Args:
+        config_dir: Directory containing config files
+
+    Returns:
+        Combined configuration dictionary
+    """
+    return asyncio.run(load_config_async(config_dir))
+
+
+def _get_mcp_client() -> "httpx.AsyncClient":
+    """HTTP client for requests to the MCP server, created on first use."""
+    global _mcp_client
+    if _mcp_client is None:
+        import httpx
+
+        _mcp_client = httpx.AsyncClient()
+    return _mcp_client
+
+
+async def close_mcp_client() -> None:
+    """Close the shared MCP HTTP client, if it was created."""
+    global _mcp_client
+    client, _mcp_client = _mcp_client, None
+    if client is not None:
+        await client.aclose()
+
+
 async def check_mcp_server(url: str = "http://localhost:8000") -> bool:
     """Check if MCP server is running by testing SSE endpoint."""
     import httpx
 
     try:
-        async with httpx.AsyncClient() as client:
-            # Try to connect to SSE endpoint (will return 405 if server is up but wrong method)
-            response = await client.get(f"{url}/sse", timeout=2.0)
+        # Stream so only the response head is read; the SSE body never ends
+        async with _get_mcp_client().stream("GET", f"{url}/sse", timeout=2.0):
             # Any response (even error) means server is running
             return True
     except httpx.ConnectError:
@@ -89,7 +214,7 @@ async def main() -> int:
 
     # Load configuration
     try:
-        config = load_config()
+        config = await load_config_async()
         print("✓ Configuration loaded")
     except Exception as e:
         print(f"✗ Error loading configuration: {e}", file=sys.stderr)
@@ -99,7 +224,8 @@ async def main() -> int:
     print("Checking Ollama connection...")
     try:
         import ollama
-        models = ollama.list()
+        base_url = config.get("ollama", {}).get("base_url", "http://localhost:11434")
+        models = ollama.Client(host=base_url).list()
         model_count = len(models.get("models", []))
         print(f"✓ Ollama connected ({model_count} models available)")
     except Exception as e:
@@ -108,7 +234,11 @@ async def main() -> int:
 
     print()
 
-    # Start terminal interface
+    # Start terminal interface. Imported only now: it pulls in the agent,
+    # the MCP client, Rich and prompt_toolkit, which a failed server
+    # check above doesn't need
+    from cli.interface import run_terminal_interface
+
     try:
         await run_terminal_interface(config)
         return 0
@@ -122,9 +252,17 @@ async def main() -> int:
         return 1
 
 
+async def _run() -> int:
+    """Run main() and release the shared HTTP client afterwards."""
+    try:
+        return await main()
+    finally:
+        await close_mcp_client()
+
+
 def cli_main() -> None:
     """CLI entry point for poetry script."""
-    sys.exit(asyncio.run(main()))
+    sys.exit(asyncio.run(_run()))
 
 
 if __name__ == "__main__":
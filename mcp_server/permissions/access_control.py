@@ -11,6 +11,9 @@ from mcp_server.utils.error_handlers import PermissionError as PermissionDeniedE
 
 logger = get_logger(__name__)
 
+# libyaml's parser when PyYAML was built with it, else the pure-Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class PermissionManager:
     """Manages permissions for file/directory access and operations."""
@@ -31,8 +34,7 @@ class PermissionManager:
     def _load_config(self) -> Dict[str, Any]:
         """Load permissions configuration from YAML."""
         try:
-            with open(self.config_path, "r") as f:
-                return yaml.safe_load(f)
+            return yaml.load(Path(self.config_path).read_bytes(), Loader=_YAML_LOADER)
         except Exception as e:
             logger.error(f"Failed to load permissions config: {e}")
             return {}
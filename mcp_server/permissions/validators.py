@@ -102,7 +102,8 @@ class InputValidator:
         command = command.strip()
 
         if allowed_commands:
-            cmd_prefix = command.split()[0] if command.split() else ""
+            # First word only; maxsplit keeps long commands from being split whole
+            cmd_prefix = command.split(None, 1)[0] if command else ""
             if not any(cmd_prefix.startswith(allowed) for allowed in allowed_commands):
                 raise ValidationError(
                     f"Command not allowed: {cmd_prefix}",
@@ -10,6 +10,9 @@ from mcp_server.tools import FileTools, SearchTools, ShellTools, WebTools
 from mcp_server.permissions import PermissionManager
 from mcp_server.utils import setup_logger, get_logger
 
+# libyaml's parser when PyYAML was built with it, else the pure-Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class MCPServer:
     """MCP server with Claude Code-like tools."""
@@ -71,8 +74,7 @@ class MCPServer:
         for key, filename in config_files.items():
             config_path = self.config_dir / filename
             try:
-                with open(config_path, "r") as f:
-                    configs[key] = yaml.safe_load(f)
+                configs[key] = yaml.load(config_path.read_bytes(), Loader=_YAML_LOADER)
             except Exception as e:
                 print(f"Warning: Failed to load {filename}: {e}")
                 configs[key] = {}
@@ -291,11 +293,25 @@ class MCPServer:
         
         # Get the SSE app from FastMCP
         sse_app = self.mcp.sse_app()
-        
+
+        async def unbuffered_sse_app(scope, receive, send):
+            """Mark event streams so reverse proxies (nginx) don't buffer them."""
+            async def send_unbuffered(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    if (b"content-type", b"text/event-stream") in (
+                        (name.lower(), value.partition(b";")[0].strip()) for name, value in headers
+                    ):
+                        headers.append((b"x-accel-buffering", b"no"))
+                        message = {**message, "headers": headers}
+                await send(message)
+
+            await sse_app(scope, receive, send_unbuffered)
+
         # Create a Starlette app with both SSE and HTTP endpoints
         routes = [
             Route("/tools", list_tools_endpoint, methods=["GET"]),
-            Mount("/", app=sse_app),
+            Mount("/", app=unbuffered_sse_app),
         ]
         
         app = Starlette(routes=routes)
@@ -202,10 +202,10 @@ async def test_agent_startup():
     try:
         sys.path.insert(0, ".")
         from agent.agent_core import AgentCore
-        from main import load_config
+        from main import load_config_async
 
         print("Loading configuration...", end=" ", flush=True)
-        config = load_config()
+        config = await load_config_async()
         print("✓")
 
         print("Initializing agent...", end=" ", flush=True)
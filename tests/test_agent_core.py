@@ -1,8 +1,18 @@
 """Tests for AgentCore."""
 
+import asyncio
+import ollama
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from agent.agent_core import AgentCore
+from agent.context_manager import ContextManager
+from agent.agent_core import (
+    AgentCore,
+    _JsonStreamScanner,
+    _extract_json,
+    _format_tool_result,
+    _parse_json_object,
+    _render_tools_compact,
+)
 
 
 @pytest.fixture
@@ -72,6 +82,19 @@ async def test_direct_response(agent_core):
     agent_core.context.add_message.assert_called()
 
 
+def test_history_windowing_opt_in(config):
+    """Test the history budget only applies when tokens.window_history is set."""
+    with patch("agent.agent_core.OllamaClient"), \
+         patch("agent.agent_core.ContextManager"), \
+         patch("agent.agent_core.ErrorRecoverySystem"), \
+         patch("agent.agent_core.ToolExecutor"):
+        config["agent"]["tokens"] = {"max_context_tokens": 2048, "response_reserve": 512}
+        assert AgentCore(config)._context_tokens is None
+
+        config["agent"]["tokens"]["window_history"] = True
+        assert AgentCore(config)._context_tokens == 1536
+
+
 @pytest.mark.asyncio
 async def test_toggle_agent_mode(agent_core):
     """Test toggling agent mode."""
@@ -109,27 +132,27 @@ async def test_list_models(agent_core):
 @pytest.mark.asyncio
 async def test_think_phase(agent_core):
     """Test think phase."""
-    agent_core.ollama.generate = AsyncMock(
-        return_value="Analyzing the request..."
+    agent_core.ollama.chat = AsyncMock(
+        return_value={"message": {"content": "Analyzing the request..."}}
     )
 
     thought = await agent_core._think("Test request", 1)
 
-    assert thought == "Analyzing the request..."
-    agent_core.ollama.generate.assert_called_once()
+    assert thought["message"]["content"] == "Analyzing the request..."
+    agent_core.ollama.chat.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_plan_phase(agent_core):
     """Test plan phase."""
-    agent_core.ollama.generate = AsyncMock(
-        return_value="1. Read file\n2. Process data\n3. Write results"
+    agent_core.ollama.chat = AsyncMock(
+        return_value={"message": {"content": "1. Read file\n2. Process data\n3. Write results"}}
     )
 
     plan = await agent_core._plan("Test request", 1)
 
-    assert "Read file" in plan
-    agent_core.ollama.generate.assert_called_once()
+    assert "Read file" in plan["message"]["content"]
+    agent_core.ollama.chat.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -183,7 +206,483 @@ async def test_reflect_phase(agent_core):
 async def test_cleanup(agent_core):
     """Test cleanup."""
     agent_core.tool_executor.close = AsyncMock()
+    agent_core.ollama.close = AsyncMock()
 
     await agent_core.cleanup()
 
     agent_core.tool_executor.close.assert_called_once()
+    agent_core.ollama.close.assert_awaited_once()
+    agent_core.context.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_closes_context_after_failure(agent_core):
+    """Test the context journal is still closed when closing a client fails."""
+    agent_core.tool_executor.close = AsyncMock()
+    agent_core.ollama.close = AsyncMock(side_effect=AttributeError("close"))
+
+    with pytest.raises(AttributeError):
+        await agent_core.cleanup()
+
+    agent_core.context.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_process_request_batch(agent_core):
+    """Test batched requests keep order and run in separate conversations."""
+    agent_core.enabled = False
+
+    async def chat(messages, **kwargs):
+        return {"message": {"content": messages[-1]["content"].upper()}}
+
+    agent_core.ollama.chat = chat
+
+    responses = await agent_core.process_request_batch(["one", "two", "three"], concurrency=2)
+
+    assert responses == ["ONE", "TWO", "THREE"]
+    agent_core.context.add_message.assert_called_once()  # only the system prompt
+
+
+@pytest.mark.asyncio
+async def test_fork_shares_tool_cache_and_is_quiet(agent_core, capsys):
+    """Test a write in one fork keeps reads in another from being cached, and forks print nothing."""
+    agent_core._heartbeat_after = agent_core._heartbeat_interval = 0.001
+    first, second = agent_core._fork(), agent_core._fork()
+    assert first._tool_cache is second._tool_cache
+    assert first._tool_cache_state is second._tool_cache_state
+
+    async def execute_tool(name, arguments):
+        if name == "write_file":
+            await asyncio.sleep(0.02)
+        return {"success": True}
+
+    agent_core.tool_executor.execute_tool = AsyncMock(side_effect=execute_tool)
+
+    await asyncio.gather(
+        first._with_heartbeat(first._execute_tool("write_file", {"file_path": "a.txt", "content": ""})),
+        second._execute_tool("read_file", {"file_path": "a.txt"}),
+    )
+
+    assert agent_core._tool_cache == {}
+    assert capsys.readouterr().out == ""
+
+
+def test_is_conversational(agent_core):
+    """Test greetings, and messages of up to two words starting with one, are conversational."""
+    assert agent_core._is_conversational("Hello")
+    assert agent_core._is_conversational("thanks!")
+    assert agent_core._is_conversational("hi there")
+    assert agent_core._is_conversational("history")
+    assert not agent_core._is_conversational("hi, read main.py please")
+    assert not agent_core._is_conversational("read main.py")
+
+
+def test_extract_json_nested():
+    """Test JSON extraction keeps nested objects and ignores braces in strings."""
+    text = 'Sure! {"tool": "write_file", "arguments": {"file_path": "a.txt", "content": "x}"}} done'
+
+    assert _extract_json(text) == (
+        '{"tool": "write_file", "arguments": {"file_path": "a.txt", "content": "x}"}}'
+    )
+    assert _extract_json("no json here") is None
+
+
+def test_parse_json_object():
+    """Test bare and embedded JSON objects are both parsed."""
+    assert _parse_json_object(' {"tool":"glob","arguments":{}}\n') == {"tool": "glob", "arguments": {}}
+    assert _parse_json_object('Use {"tool": "glob"} now') == {"tool": "glob"}
+    assert _parse_json_object("nothing") is None
+
+
+def test_render_tools_compact():
+    """Test the tool catalog lists every known tool's arguments and tolerates unknown tools."""
+    catalog = _render_tools_compact(["grep", "web_search", "custom"])
+
+    assert catalog == (
+        '[{"name":"grep","args":["pattern","path?"]},'
+        '{"name":"web_search","args":["query","max_results?"]},'
+        '{"name":"custom"}]'
+    )
+
+
+def test_format_tool_result():
+    """Test user-ready tools are formatted and everything else defers to the model."""
+    assert _format_tool_result("glob", {"matches": [{"path": "a.py"}, {"path": "b/c.py"}]}) == "a.py\nb/c.py"
+    assert _format_tool_result("bash", {"stdout": "ok\n"}) == "```\nok\n```"
+    assert _format_tool_result("bash", {"stdout": ""}) is None
+    assert _format_tool_result("grep", {"results": []}) is None
+
+
+def test_json_stream_scanner():
+    """Test the stream scanner returns the object once its closing brace arrives."""
+    scanner = _JsonStreamScanner()
+
+    assert scanner.feed('Here: {"tool": "grep", ') is None
+    assert scanner.feed('"arguments": {"pattern": "{"}') is None
+    assert scanner.feed('} trailing text') == (
+        '{"tool": "grep", "arguments": {"pattern": "{"}}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_reason_runs_think_and_plan(agent_core):
+    """Test think and plan phases both run when enabled."""
+    with patch.object(AgentCore, "_think", AsyncMock(return_value={"response": "Thinking..."})), \
+         patch.object(AgentCore, "_plan", AsyncMock(return_value={"response": "1. Read file"})):
+        thought, plan = await agent_core._reason("Test request", 1)
+
+    assert thought == "Thinking..."
+    assert plan == "1. Read file"
+
+
+@pytest.mark.asyncio
+async def test_think_phase_cached(agent_core):
+    """Test identical think prompts are served from the response cache."""
+    agent_core.ollama.chat = AsyncMock(return_value={"message": {"content": "Analyzing..."}})
+
+    first = await agent_core._think("Test request", 1)
+    second = await agent_core._think("Test request", 1)
+
+    assert first == second
+    agent_core.ollama.chat.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_reason_reads_chat_response(agent_core):
+    """Test think and plan text is read from ollama's ChatResponse objects."""
+    agent_core.context.get_messages_for_llm.return_value = []
+    agent_core.ollama.chat = AsyncMock(side_effect=[
+        ollama.ChatResponse(model="test-model", message=ollama.Message(role="assistant", content="Thinking...")),
+        ollama.ChatResponse(model="test-model", message=ollama.Message(role="assistant", content="1. Read file")),
+    ])
+
+    thought, plan = await agent_core._reason("Test request", 1)
+
+    assert thought == "Thinking..."
+    assert plan == "1. Read file"
+
+
+@pytest.mark.asyncio
+async def test_phase_cache_keyed_on_history(agent_core):
+    """Test a phase prompt is not replayed for a different conversation."""
+    agent_core.ollama.chat = AsyncMock(return_value={"message": {"content": "Analyzing..."}})
+    agent_core.context.get_messages_for_llm.return_value = [{"role": "user", "content": "first"}]
+    await agent_core._think("Test request", 1)
+    await agent_core._think("Test request", 1)
+    agent_core.context.get_messages_for_llm.return_value = [{"role": "user", "content": "second"}]
+    await agent_core._think("Test request", 1)
+
+    assert agent_core.ollama.chat.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_act_direct_executes_tool(agent_core):
+    """Test direct act phase parses the tool call and executes it."""
+    agent_core._available_tools_cache = ["list_directory"]
+
+    async def stream():
+        yield '{"tool": "list_directory", '
+        yield '"arguments": {"directory": "."}}'
+        yield " Would you like anything else?"
+
+    agent_core.ollama.generate = AsyncMock(return_value=stream())
+    agent_core.tool_executor.execute_tool = AsyncMock(return_value={"success": True})
+
+    result = await agent_core._act_direct("list files")
+
+    assert result["action"] == "list_directory"
+    assert result["success"] is True
+    agent_core.tool_executor.execute_tool.assert_called_once_with(
+        "list_directory", {"directory": "."}
+    )
+
+
+@pytest.mark.asyncio
+async def test_act_direct_parse_error(agent_core):
+    """Test a response without JSON yields a parse_error result."""
+    agent_core._available_tools_cache = ["list_directory"]
+    agent_core.verbose = False
+
+    async def stream():
+        yield "I am not sure which tool to use."
+
+    agent_core.ollama.generate = AsyncMock(return_value=stream())
+
+    result = await agent_core._act_direct("list files")
+
+    assert result["action"] == "parse_error"
+    assert result["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_with_heartbeat_prints_progress(agent_core, capsys):
+    """Test progress dots appear only once a wait exceeds the threshold."""
+    agent_core._heartbeat_after = 0.01
+    agent_core._heartbeat_interval = 0.01
+
+    assert await agent_core._with_heartbeat(asyncio.sleep(0, result="fast")) == "fast"
+    assert capsys.readouterr().out == ""
+
+    assert await agent_core._with_heartbeat(asyncio.sleep(0.05, result="slow")) == "slow"
+    assert capsys.readouterr().out.startswith(".")
+
+
+@pytest.mark.asyncio
+async def test_agentic_loop_dedupes_tool_calls(agent_core, config):
+    """Test identical tool calls in one response execute once."""
+    agent_core.context = ContextManager(config)
+    agent_core.agent_config["stream_responses"] = False
+    agent_core._think_enabled = agent_core._plan_enabled = False
+    agent_core._available_tools_cache = ["grep"]
+    call = {"function": {"name": "grep", "arguments": {"pattern": "TODO"}}}
+    agent_core.ollama.chat = AsyncMock(side_effect=[
+        {"message": {"content": "", "tool_calls": [call, call]}},
+        {"message": {"content": "Found it."}},
+    ])
+    agent_core.tool_executor.execute_tool = AsyncMock(return_value={"success": True, "result": {}})
+
+    response = await agent_core.process_request("find TODO comments")
+
+    assert response == "Found it."
+    agent_core.tool_executor.execute_tool.assert_called_once_with("grep", {"pattern": "TODO"})
+
+
+@pytest.mark.asyncio
+async def test_run_tool_calls_orders_around_writes(agent_core):
+    """Test reads run together but never overlap a write that comes before or after them."""
+    events = []
+
+    async def execute_tool(name, arguments):
+        events.append(("start", name))
+        await asyncio.sleep(0.01)
+        events.append(("end", name))
+        return {"success": True, "name": name}
+
+    agent_core.tool_executor.execute_tool = AsyncMock(side_effect=execute_tool)
+    calls = [
+        ("read_file", {"file_path": "a.txt"}),
+        ("grep", {"pattern": "x"}),
+        ("write_file", {"file_path": "a.txt", "content": "new"}),
+        ("read_file", {"file_path": "a.txt"}),
+    ]
+
+    results = await agent_core._run_tool_calls(calls, {}, 5)
+
+    assert [r["tool"] for r in results] == ["read_file", "grep", "write_file", "read_file"]
+    assert events[:2] == [("start", "read_file"), ("start", "grep")]
+    write_start = events.index(("start", "write_file"))
+    assert events[write_start - 2:write_start] in (
+        [("end", "read_file"), ("end", "grep")], [("end", "grep"), ("end", "read_file")]
+    )
+    assert events[write_start + 1:] == [("end", "write_file"), ("start", "read_file"), ("end", "read_file")]
+
+
+@pytest.mark.asyncio
+async def test_agentic_loop_plan_done_token(agent_core, config):
+    """Test only a plan that is the done token skips tool selection, not one mentioning completion."""
+    agent_core.context = ContextManager(config)
+    agent_core.agent_config["stream_responses"] = False
+    agent_core._available_tools_cache = ["edit_file"]
+    agent_core.ollama.chat = AsyncMock(return_value={"message": {"content": "Done."}})
+
+    with patch.object(AgentCore, "_reason", AsyncMock(return_value=(None, "1. edit the file 2. verify the task complete"))), \
+         patch.object(AgentCore, "_direct_response", AsyncMock(return_value="direct")) as direct:
+        assert await agent_core.process_request("fix the typo") == "Done."
+        direct.assert_not_called()
+        assert "tools" in agent_core.ollama.chat.call_args.kwargs
+
+    with patch.object(AgentCore, "_reason", AsyncMock(return_value=(None, " NO_ACTION_NEEDED\n"))), \
+         patch.object(AgentCore, "_direct_response", AsyncMock(return_value="direct")):
+        assert await agent_core.process_request("explain the build config") == "direct"
+        agent_core.ollama.chat.assert_awaited_once()  # only the first request selected tools
+
+
+@pytest.mark.asyncio
+async def test_agentic_loop_runs_identical_bash_calls(agent_core, config):
+    """Test identical mutating calls are not merged."""
+    agent_core.context = ContextManager(config)
+    agent_core.agent_config["stream_responses"] = False
+    agent_core._think_enabled = agent_core._plan_enabled = False
+    agent_core._available_tools_cache = ["bash"]
+    call = {"function": {"name": "bash", "arguments": {"command": "echo x >> log"}}}
+    agent_core.ollama.chat = AsyncMock(side_effect=[
+        {"message": {"content": "", "tool_calls": [call, call]}},
+        {"message": {"content": "Appended twice."}},
+    ])
+    agent_core.tool_executor.execute_tool = AsyncMock(return_value={"success": True, "result": {}})
+
+    await agent_core.process_request("append x to log twice")
+
+    assert agent_core.tool_executor.execute_tool.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_agentic_loop_stream_times_out(agent_core, config):
+    """Test a stalled tool-selection stream gives up after llm_timeout."""
+    agent_core.context = ContextManager(config)
+    agent_core.agent_config["llm_timeout"] = 0.01
+    agent_core._think_enabled = agent_core._plan_enabled = False
+    agent_core._available_tools_cache = ["grep"]
+
+    async def stream():
+        await asyncio.sleep(10)
+        yield {"content": "late"}
+
+    agent_core.ollama.chat_stream_message_async = MagicMock(return_value=stream())
+
+    response = await agent_core.process_request("find TODO comments")
+
+    assert "took too long" in response
+
+
+@pytest.mark.asyncio
+async def test_run_tool_captures_errors(agent_core):
+    """Test tool failures become results so gathered siblings still complete."""
+    agent_core.tool_executor.execute_tool = AsyncMock(side_effect=RuntimeError("boom"))
+
+    result = await agent_core._run_tool("grep", {"pattern": "x"}, 5)
+
+    assert result == {"tool": "grep", "result": None, "success": False, "error": "boom"}
+
+
+@pytest.mark.asyncio
+async def test_tools_for_ollama_built_once(agent_core):
+    """Test the Ollama tool list is cached until the model changes."""
+    agent_core._available_tools_cache = ["read_file", "web_search"]
+
+    tools = await agent_core._get_tools_for_ollama()
+
+    assert [t["function"]["name"] for t in tools] == ["read_file"]
+    assert await agent_core._get_tools_for_ollama() is tools
+
+    agent_core.ollama.switch_model = MagicMock(return_value=True)
+    agent_core.switch_model("other-model")
+    assert await agent_core._get_tools_for_ollama() is not tools
+
+
+@pytest.mark.asyncio
+async def test_prefetch_tools_reuses_task(agent_core):
+    """Test the tools prefetch runs once and is shared by later turns."""
+    agent_core.tool_executor.list_tools = AsyncMock(return_value=["grep"])
+
+    task = agent_core._prefetch_tools()
+
+    assert agent_core._prefetch_tools() is task
+    assert [t["function"]["name"] for t in await task] == ["grep"]
+    agent_core.tool_executor.list_tools.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_tool_selection(agent_core, capsys):
+    """Test the streamed first pass prints text and collects tool calls."""
+    tool_call = {"function": {"name": "write_file", "arguments": {"file_path": "a.txt"}}}
+
+    async def stream():
+        yield {"content": "Looking "}
+        yield {"content": "now."}
+        yield {"content": "", "tool_calls": [tool_call]}
+
+    agent_core.ollama.chat_stream_message_async = MagicMock(return_value=stream())
+
+    response, started = await agent_core._stream_tool_selection([], [], 5)
+
+    assert response["message"]["content"] == "Looking now."
+    assert response["message"]["tool_calls"] == [tool_call]
+    assert started == {}
+    assert "Looking now." in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_stream_tool_selection_starts_read_only_tools(agent_core):
+    """Test read-only tool calls are dispatched before the stream finishes."""
+    tool_call = {"function": {"name": "read_file", "arguments": {"file_path": "a.txt"}}}
+    agent_core.tool_executor.execute_tool = AsyncMock(return_value={"success": True})
+
+    async def stream():
+        yield {"content": "", "tool_calls": [tool_call]}
+        yield {"content": "", "done": True}
+
+    agent_core.ollama.chat_stream_message_async = MagicMock(return_value=stream())
+
+    _, started = await agent_core._stream_tool_selection([], [], 5)
+
+    assert list(started) == [0]
+    assert (await started[0])["success"] is True
+    agent_core.tool_executor.execute_tool.assert_called_once_with("read_file", {"file_path": "a.txt"})
+
+
+@pytest.mark.asyncio
+async def test_stream_tool_selection_holds_reads_after_write(agent_core):
+    """Test reads after a mutating call in the stream are not started early."""
+    edit = {"function": {"name": "edit_file", "arguments": {"file_path": "a.txt"}}}
+    read = {"function": {"name": "read_file", "arguments": {"file_path": "a.txt"}}}
+    agent_core.tool_executor.execute_tool = AsyncMock(return_value={"success": True})
+
+    async def stream():
+        yield {"content": "", "tool_calls": [edit, read]}
+
+    agent_core.ollama.chat_stream_message_async = MagicMock(return_value=stream())
+
+    response, started = await agent_core._stream_tool_selection([], [], 5)
+
+    assert started == {}
+    assert response["message"]["tool_calls"] == [edit, read]
+    agent_core.tool_executor.execute_tool.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_reuses_and_invalidates(agent_core):
+    """Test read-only results are reused until a write touches the same path."""
+    agent_core.tool_executor.execute_tool = AsyncMock(return_value={"success": True})
+
+    await agent_core._execute_tool("read_file", {"file_path": "a.txt"})
+    await agent_core._execute_tool("read_file", {"file_path": "a.txt"})
+    assert agent_core.tool_executor.execute_tool.call_count == 1
+
+    await agent_core._execute_tool("write_file", {"file_path": "b.txt", "content": ""})
+    await agent_core._execute_tool("read_file", {"file_path": "a.txt"})
+    assert agent_core.tool_executor.execute_tool.call_count == 2
+
+    await agent_core._execute_tool("edit_file", {"file_path": "a.txt"})
+    await agent_core._execute_tool("read_file", {"file_path": "a.txt"})
+    assert agent_core.tool_executor.execute_tool.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_skips_reads_during_write(agent_core):
+    """Test a read gathered with a write doesn't cache the pre-write content."""
+    async def execute_tool(name, arguments):
+        if name == "write_file":
+            await asyncio.sleep(0.01)
+        return {"success": True}
+
+    agent_core.tool_executor.execute_tool = AsyncMock(side_effect=execute_tool)
+
+    await asyncio.gather(
+        agent_core._execute_tool("write_file", {"file_path": "a.txt", "content": "new"}),
+        agent_core._execute_tool("read_file", {"file_path": "a.txt"}),
+    )
+    await agent_core._execute_tool("read_file", {"file_path": "a.txt"})
+
+    assert agent_core.tool_executor.execute_tool.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_final_response_uses_tool_result(agent_core):
+    """Test direct tool responses skip the final LLM call."""
+    agent_core.direct_tool_response = True
+    agent_core.ollama.chat = AsyncMock()
+    action_result = {
+        "action": "list_directory",
+        "result": {
+            "success": True,
+            "result": {"directories": [{"name": "src"}], "files": [{"name": "main.py"}]},
+        },
+        "success": True,
+    }
+
+    await agent_core._observe(action_result)
+    response = await agent_core._generate_final_response()
+
+    assert response == "src/\nmain.py"
+    agent_core.ollama.chat.assert_not_called()
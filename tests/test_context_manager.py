@@ -0,0 +1,246 @@
+"""Tests for ContextManager."""
+
+import asyncio
+import pytest
+from agent.context_manager import ContextManager
+
+
+@pytest.fixture
+def context():
+    """Create a ContextManager instance."""
+    return ContextManager({"memory": {"enabled": True, "max_messages": 100}})
+
+
+def test_add_message(context):
+    """Test adding messages."""
+    context.add_message("system", "You are helpful")
+    context.add_message("user", "Hello")
+
+    messages = context.get_messages()
+
+    assert len(messages) == 2
+    assert messages[1]["role"] == "user"
+    assert isinstance(messages[1]["ts"], int)
+    assert messages[1]["content"] == "Hello"
+    assert [m["content"] for m in context.get_messages(limit=1)] == ["Hello"]
+
+
+def test_messages_for_llm_extended_incrementally(context):
+    """Test the LLM view is extended in place by add_message and rebuilt on clear."""
+    context.add_message("user", "Hello")
+
+    first = context.get_messages_for_llm()
+    assert context.get_messages_for_llm() is first
+    assert first == [{"role": "user", "content": "Hello"}]
+
+    context.add_message("assistant", "Hi!")
+    second = context.get_messages_for_llm()
+
+    assert second is first
+    assert second[-1] == {"role": "assistant", "content": "Hi!"}
+
+    context.clear()
+    assert context.get_messages_for_llm() is not first
+
+
+def test_clear(context):
+    """Test clearing the conversation."""
+    context.add_message("user", "Hello")
+    context.get_messages_for_llm()
+
+    context.clear()
+
+    assert context.get_messages() == []
+    assert context.get_messages_for_llm() == []
+
+
+def test_messages_for_llm_windowed(context):
+    """Test old history is dropped to fit the budget but the current turn is kept."""
+    context.add_message("system", "S")
+    context.add_message("user", "old question")
+    context.add_message("tool", "x" * 400)
+    context.add_message("assistant", "old answer")
+    context.add_message("user", "new question")
+    context.add_message("tool", "y" * 400)
+
+    assert len(context.get_messages_for_llm(max_tokens=1000)) == 6
+
+    windowed = context.get_messages_for_llm(max_tokens=110)
+
+    assert [m["content"] for m in windowed] == ["S", "old answer", "new question", "y" * 400]
+
+
+def test_old_tool_results_dropped(context):
+    """Test tool results from earlier turns are left out of the windowed view."""
+    context.tool_result_turns = 1
+    context.add_message("user", "first")
+    context.add_message("tool", "first result")
+    context.add_message("user", "second")
+    context.add_message("tool", "second result")
+    context.add_message("user", "third")
+
+    contents = [m["content"] for m in context.get_messages_for_llm(max_tokens=1000)]
+
+    assert contents == ["first", "second", "second result", "third"]
+
+
+def test_save_and_load(context, tmp_path):
+    """Test a saved conversation loads back unchanged."""
+    context.add_message("user", "héllo")
+    context.add_message("assistant", "Hi!")
+    filepath = context.save(str(tmp_path / "conversation.json"))
+    pretty_path = context.save(str(tmp_path / "pretty.json"), pretty=True)
+
+    assert len(open(filepath, "rb").read().splitlines()) == 1
+
+    for path in (filepath, pretty_path):
+        restored = ContextManager({"memory": {"enabled": True}})
+
+        assert restored.load(path) is True
+        assert restored.get_messages() == context.get_messages()
+        assert restored.session_id == context.session_id
+
+
+def test_jsonl_journal(tmp_path):
+    """Test jsonl mode appends messages as they are added and loads them back."""
+    config = {"memory": {"persist": {"directory": str(tmp_path), "format": "jsonl"}}}
+    context = ContextManager(config)
+    context.add_message("user", "Hello")
+    context.add_message("assistant", "Hi!")
+
+    filepath = context.save()
+    lines = (tmp_path / f"conversation_{context.session_id}.jsonl").read_bytes().splitlines()
+
+    assert filepath.endswith(".jsonl")
+    assert len(lines) == 3  # metadata header + one line per message
+
+    context.clear()
+    context.add_message("user", "After clear")
+    context.close()
+
+    restored = ContextManager(config)
+    assert restored.load(filepath) is True
+    assert [m["content"] for m in restored.get_messages()] == ["After clear"]
+
+
+def test_jsonl_journal_keeps_trimmed_history(tmp_path):
+    """Test loading a journal longer than max_messages doesn't drop its older lines."""
+    config = {
+        "memory": {
+            "max_messages": 3,
+            "summarize": {"enabled": False},
+            "persist": {"directory": str(tmp_path), "format": "jsonl"},
+        }
+    }
+    context = ContextManager(config)
+    for i in range(5):
+        context.add_message("user", str(i))
+    filepath = context.save()
+    context.close()
+
+    restored = ContextManager(config)
+    assert restored.load(filepath) is True
+    assert len(restored.get_messages()) == 3
+    restored.add_message("user", "5")
+    assert restored.save() == filepath
+    restored.close()
+
+    reloaded = ContextManager({"memory": {"persist": {"directory": str(tmp_path), "format": "jsonl"}}})
+    assert reloaded.load(filepath) is True
+    assert [m["content"] for m in reloaded.get_messages()] == ["0", "1", "2", "3", "4", "5"]
+
+
+@pytest.mark.asyncio
+async def test_jsonl_journal_coalesces_writes(tmp_path):
+    """Test messages added inside an event loop are written together after the interval."""
+    config = {
+        "memory": {"persist": {"directory": str(tmp_path), "format": "jsonl", "flush_interval_ms": 10}}
+    }
+    context = ContextManager(config)
+    context.add_message("user", "Hello")  # first message writes the header
+    path = tmp_path / f"conversation_{context.session_id}.jsonl"
+
+    context.add_message("assistant", "Hi!")
+    context.add_message("user", "Again")
+    assert len(path.read_bytes().splitlines()) == 2
+
+    await asyncio.sleep(0.05)
+    assert len(path.read_bytes().splitlines()) == 4
+    context.close()
+
+
+def test_trim_keeps_system_message():
+    """Test trimming keeps the system message plus the most recent messages."""
+    context = ContextManager({"memory": {"max_messages": 4, "summarize": {"enabled": False}}})
+    context.add_message("system", "S")
+    context.get_messages_for_llm()
+    for i in range(6):
+        context.add_message("user", str(i))
+
+    assert [m["content"] for m in context.get_messages()] == ["S", "3", "4", "5"]
+    assert [m["content"] for m in context.get_messages_for_llm()] == ["S", "3", "4", "5"]
+
+
+def test_trim_summarizes():
+    """Test the summarize path replaces older messages with one placeholder."""
+    context = ContextManager({
+        "memory": {"max_messages": 5, "summarize": {"threshold_messages": 5, "keep_recent": 2}}
+    })
+    context.add_message("system", "S")
+    for i in range(5):
+        context.add_message("user", str(i))
+
+    contents = [m["content"] for m in context.get_messages()]
+
+    assert contents == ["S", "[Previous 3 messages summarized]", "3", "4"]
+
+
+def test_trimmed_messages_rehydrate():
+    """Test trimmed messages move to the compressed warm tier and can be read back."""
+    context = ContextManager({
+        "memory": {"max_messages": 4, "warm_messages": 2, "summarize": {"enabled": False}}
+    })
+    context.add_message("system", "S")
+    for i in range(6):
+        context.add_message("user", str(i))
+
+    assert context.rehydrate(0) is None  # dropped past warm_messages
+    assert context.rehydrate(1)["content"] == "1"
+    assert context.rehydrate(2)["content"] == "2"
+    assert context.rehydrate(3) is None
+
+    context.clear()
+    assert context.rehydrate(2) is None
+
+
+def test_list_sessions_meta(tmp_path):
+    """Test saved sessions are listed from their headers in both formats."""
+    journal = ContextManager({"memory": {"persist": {"directory": str(tmp_path), "format": "jsonl"}}})
+    journal.session_id = "20240101_000000"
+    journal.add_message("user", "Hello")
+    journal.close()
+
+    snapshot = ContextManager({"memory": {"persist": {"directory": str(tmp_path)}}})
+    snapshot.session_id = "20240102_000000"
+    snapshot.add_message("user", "x" * 1000)
+    snapshot.save()
+    snapshot.save(str(tmp_path / "conversation_pretty.json"), pretty=True)
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    sessions = ContextManager.list_sessions_meta(str(tmp_path))
+
+    assert sorted(meta["session_id"] for meta in sessions) == [
+        "20240101_000000", "20240102_000000", "20240102_000000",
+    ]
+    assert ContextManager.list_sessions_meta(str(tmp_path / "missing")) == []
+
+
+def test_get_messages_char_budget(context):
+    """Test a character budget keeps the newest messages that fit (at least one)."""
+    for content in ("a" * 50, "b" * 30, "c" * 30):
+        context.add_message("user", content)
+
+    assert [m["content"][0] for m in context.get_messages(max_chars=60)] == ["b", "c"]
+    assert [m["content"][0] for m in context.get_messages(limit=1, max_chars=60)] == ["c"]
+    assert [m["content"][0] for m in context.get_messages(max_chars=10)] == ["c"]
+    assert len(context.get_messages(max_chars=1000)) == 3
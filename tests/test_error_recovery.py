@@ -0,0 +1,70 @@
+"""Tests for ErrorRecoverySystem."""
+
+import pytest
+from agent.error_recovery import ErrorRecoverySystem, RetryStrategy
+
+
+@pytest.fixture
+def recovery():
+    """Create an ErrorRecoverySystem instance."""
+    return ErrorRecoverySystem({
+        "error_recovery": {
+            "max_retries": 3,
+            "strategies": {
+                "network_error": {"action": "exponential_backoff", "backoff_base": 2, "backoff_max": 5},
+                "timeout": {"action": "increase_timeout", "timeout_multiplier": 1.5},
+                "odd_error": {"action": "not_a_strategy"},
+                "no_action": {"auto_retry": True},
+            },
+        }
+    })
+
+
+def test_get_retry_strategy(recovery):
+    """Test strategies come from the error first, then the configured error type."""
+    assert recovery.get_retry_strategy({"retry_strategy": "fix_and_retry"}) == RetryStrategy.FIX_AND_RETRY
+    assert recovery.get_retry_strategy({"retry_strategy": "bogus"}) == RetryStrategy.REPORT_AND_ASK
+    assert recovery.get_retry_strategy({"error_type": "timeout"}) == RetryStrategy.INCREASE_TIMEOUT
+    assert recovery.get_retry_strategy({"error_type": "odd_error"}) == RetryStrategy.REPORT_AND_ASK
+    assert recovery.get_retry_strategy({"error_type": "no_action"}) is None
+    assert recovery.get_retry_strategy({}) is None
+
+
+@pytest.mark.asyncio
+async def test_handle_error_dispatches_strategy(recovery):
+    """Test handle_error runs the strategy's handler and counts the retry."""
+    error = {"retryable": True, "error_type": "timeout"}
+
+    result = await recovery.handle_error(error, "op", {"timeout": 10})
+
+    assert result["action"] == "retry"
+    assert result["new_timeout"] == 15
+    assert result["retry_count"] == 1
+
+    result = await recovery.handle_error({"retryable": True, "retry_strategy": "report_and_ask"}, "op", {})
+    assert result["action"] == "ask_user"
+
+
+def test_exponential_backoff_clamped(recovery):
+    """Test backoff doubles per retry and stops at backoff_max."""
+    waits = []
+    for retry_count in range(5):
+        recovery.retry_counts["op"] = retry_count
+        waits.append(recovery._exponential_backoff({}, {"operation_id": "op"})["wait_seconds"])
+
+    assert waits == [1, 2, 4, 5, 5]
+
+
+@pytest.mark.asyncio
+async def test_retry_counts_bounded(recovery, monkeypatch):
+    """Test the least recently retried operations are forgotten past the cap."""
+    from agent import error_recovery
+
+    monkeypatch.setattr(error_recovery, "_MAX_TRACKED_OPERATIONS", 2)
+    error = {"retryable": True, "retry_strategy": "fix_and_retry"}
+
+    for operation_id in ("a", "b", "a", "c"):
+        await recovery.handle_error(error, operation_id, {})
+
+    assert list(recovery.retry_counts) == ["a", "c"]
+    assert recovery.get_retry_count("a") == 2
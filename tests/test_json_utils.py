@@ -0,0 +1,25 @@
+"""Tests for JSON helpers."""
+
+from agent import json_utils
+
+
+def test_dumps_compact():
+    """Test output has no whitespace padding and keeps non-ASCII text."""
+    assert json_utils.dumps([{"tool": "read_file", "data": {"content": "héllo"}}]) == (
+        '[{"tool":"read_file","data":{"content":"héllo"}}]'
+    )
+
+
+def test_round_trip():
+    """Test loads accepts what dumps produces."""
+    data = {"a": [1, 2.5, None, True], "b": "x"}
+
+    assert json_utils.loads(json_utils.dumps(data)) == data
+
+
+def test_dumps_key_canonical():
+    """Test key order doesn't change the key and unknown types are stringified."""
+    from pathlib import Path
+
+    assert json_utils.dumps_key({"b": 1, "a": 2}) == json_utils.dumps_key({"a": 2, "b": 1})
+    assert json_utils.dumps_key({"path": Path("x")}) == '{"path":"x"}'
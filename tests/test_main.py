@@ -0,0 +1,68 @@
+"""Tests for configuration loading in main."""
+
+import os
+import pytest
+import main
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    """Create a config directory and point the config cache into tmp_path."""
+    monkeypatch.setattr(main, "_config_cache_dir", lambda: tmp_path / "cache")
+    directory = tmp_path / "config"
+    directory.mkdir()
+    (directory / "agent_config.yaml").write_text("agent:\n  name: test\n")
+    (directory / "tools_config.yaml").write_text("bash:\n  default_timeout: 120\n")
+    (directory / "permissions_config.yaml").write_text("mode: ask\n")
+    return directory
+
+
+def test_load_config_merges_files(config_dir):
+    """Test agent settings are merged at the top level and the rest namespaced."""
+    config = main.load_config(str(config_dir))
+
+    assert config == {
+        "agent": {"name": "test"},
+        "tools_config": {"bash": {"default_timeout": 120}},
+        "permissions_config": {"mode": "ask"},
+    }
+
+
+def test_load_config_cache_invalidated_on_change(config_dir, monkeypatch):
+    """Test the cached config is reused until a file changes."""
+    first = main.load_config(str(config_dir))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("YAML parsed despite a valid cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(main.yaml, "load", fail)
+        assert main.load_config(str(config_dir)) == first
+
+    agent_file = config_dir / "agent_config.yaml"
+    agent_file.write_text("agent:\n  name: changed\n")
+    os.utime(agent_file, ns=(0, 0))
+
+    assert main.load_config(str(config_dir))["agent"] == {"name": "changed"}
+
+
+def test_load_config_reports_broken_file(config_dir, capsys):
+    """Test a file that fails to parse is reported and the others still load."""
+    (config_dir / "tools_config.yaml").write_text("bash: [unclosed\n")
+
+    config = main.load_config(str(config_dir))
+
+    assert "tools_config" not in config
+    assert config["permissions_config"] == {"mode": "ask"}
+    assert "tools_config.yaml" in capsys.readouterr().err
+
+
+def test_load_config_missing_file(config_dir, capsys):
+    """Test a missing file is reported, and adding it later invalidates the cache."""
+    (config_dir / "permissions_config.yaml").unlink()
+
+    assert "permissions_config" not in main.load_config(str(config_dir))
+    assert "permissions_config.yaml" in capsys.readouterr().err
+
+    (config_dir / "permissions_config.yaml").write_text("mode: strict\n")
+    assert main.load_config(str(config_dir))["permissions_config"] == {"mode": "strict"}
@@ -0,0 +1,81 @@
+"""Tests for OllamaClient."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from agent.ollama_client import OllamaClient
+
+
+@pytest.mark.asyncio
+async def test_close_closes_http_clients():
+    """Test close() shuts the underlying httpx clients (ollama 0.4 clients have no close())."""
+    ollama = OllamaClient({"agent": {"default_model": "a"}})
+    http_client = ollama._client._client
+    async_http_client = ollama._async_client._client
+
+    await ollama.close()
+
+    assert http_client.is_closed
+    assert async_http_client.is_closed
+
+
+def test_list_models_cached():
+    """Test list_models reuses its result and switch_model refreshes on a miss."""
+    with patch("ollama.Client") as client_cls:
+        client = client_cls.return_value
+        client.list.return_value = {"models": [{"name": "b"}, {"model": "a"}]}
+        ollama = OllamaClient({"agent": {"default_model": "a"}})
+
+        assert ollama.list_models() == ["a", "b"]
+        assert client.list.call_count == 1
+
+        client.list.return_value = {"models": [{"name": "a"}, {"name": "c"}]}
+        assert ollama.switch_model("c") is True
+        assert client.list.call_count == 2
+        assert ollama.switch_model("missing") is False
+        assert client.list.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_message_async_uses_async_client():
+    """Test streaming chat goes through the async client and reports errors."""
+    async def chunks():
+        yield {"message": {"content": "Hel"}}
+        yield {"done": True}
+        yield {"message": {"content": "lo"}}
+
+    with patch("ollama.Client"), \
+         patch("ollama.AsyncClient") as async_cls:
+        ollama = OllamaClient({"agent": {"default_model": "a"}})
+        async_cls.return_value.chat = AsyncMock(return_value=chunks())
+
+        messages = [m async for m in ollama.chat_stream_message_async([], tools=[{"x": 1}])]
+        assert messages == [{"content": "Hel"}, {"content": "lo"}]
+        assert async_cls.return_value.chat.call_args.kwargs["tools"] == [{"x": 1}]
+
+        async_cls.return_value.chat = AsyncMock(side_effect=ConnectionError("down"))
+        assert [m async for m in ollama.chat_stream_message_async([])] == [{"error": "down"}]
+
+
+def test_extract_tool_calls():
+    """Test tool calls are projected to tool/arguments pairs."""
+    with patch("ollama.Client"), patch("ollama.AsyncClient"):
+        ollama = OllamaClient({"agent": {"default_model": "a"}})
+
+    response = {"message": {"tool_calls": [{"function": {"name": "glob", "arguments": {"pattern": "*"}}}]}}
+
+    assert ollama.extract_tool_calls(response) == [{"tool": "glob", "arguments": {"pattern": "*"}}]
+    assert ollama.extract_tool_calls({"message": {"tool_calls": None}}) == []
+
+
+def test_chat_stream_bytes():
+    """Test streamed chat content is yielded as UTF-8 bytes."""
+    with patch("ollama.Client") as client_cls, \
+         patch("ollama.AsyncClient"):
+        ollama = OllamaClient({"agent": {"default_model": "a"}})
+        client_cls.return_value.chat.return_value = iter([
+            {"message": {"content": "hé"}},
+            {"message": {"content": ""}},
+            {"message": {"content": "llo"}},
+        ])
+
+        assert b"".join(ollama.chat_stream_bytes([])).decode() == "héllo"
@@ -1,6 +1,8 @@
 """Tests for ToolExecutor."""
 
+import asyncio
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 from agent.tool_executor import ToolExecutor
 
@@ -43,6 +45,124 @@ async def test_execute_tool_success(tool_executor):
         assert "result" in result
 
 
+@pytest.mark.asyncio
+async def test_execute_tool_parses_json_content(tool_executor):
+    """Test JSON text content is parsed and other text is wrapped."""
+    session = AsyncMock()
+    session.call_tool.return_value = SimpleNamespace(content=[SimpleNamespace(text='{"lines": 2}')])
+
+    with patch("agent.tool_executor.aconnect_sse") as mock_sse, \
+         patch("agent.tool_executor.ClientSession") as mock_session:
+        mock_sse.return_value.__aenter__.return_value = (MagicMock(), MagicMock())
+        mock_session.return_value.__aenter__.return_value = session
+
+        result = await tool_executor.execute_tool("read_file", {"file_path": "a.txt"})
+        assert result["success"] is True
+        assert result["result"] == {"lines": 2}
+
+        session.call_tool.return_value = SimpleNamespace(content=[SimpleNamespace(text="plain")])
+        result = await tool_executor.execute_tool("read_file", {"file_path": "a.txt"})
+        assert result["result"] == {"content": "plain"}
+
+        session.call_tool.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text="a"), SimpleNamespace(type="image"), SimpleNamespace(text="b")]
+        )
+        result = await tool_executor.execute_tool("read_file", {"file_path": "a.txt"})
+        assert result["result"] == {"content": "a\nb"}
+
+        session.call_tool.return_value = SimpleNamespace(content=[SimpleNamespace(text="42")])
+        result = await tool_executor.execute_tool("read_file", {"file_path": "a.txt"})
+        assert result["result"] == {"content": "42"}
+
+        session.call_tool.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text='{"ignored": true}')], structuredContent={"entries": []}
+        )
+        result = await tool_executor.execute_tool("list_directory", {})
+        assert result["result"] == {"entries": []}
+
+        # All calls went through one connection, closed with the executor
+        mock_sse.assert_called_once_with(
+            url="http://localhost:8000/sse", headers={"Cache-Control": "no-cache"}
+        )
+        session.initialize.assert_awaited_once()
+        await tool_executor.close()
+        mock_session.return_value.__aexit__.assert_awaited_once()
+        assert tool_executor.session is None
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_reconnects_after_failure(tool_executor):
+    """Test a transport failure drops the shared session so the next call reconnects."""
+    session = AsyncMock()
+    session.call_tool.side_effect = [ConnectionError("gone"), SimpleNamespace(content=[])]
+
+    with patch("agent.tool_executor.aconnect_sse") as mock_sse, \
+         patch("agent.tool_executor.ClientSession") as mock_session:
+        mock_sse.return_value.__aenter__.return_value = (MagicMock(), MagicMock())
+        mock_session.return_value.__aenter__.return_value = session
+
+        first = await tool_executor.execute_tool("bash", {"command": "ls"})
+        second = await tool_executor.execute_tool("bash", {"command": "ls"})
+
+        assert first["success"] is False
+        assert second["success"] is True
+        assert mock_sse.call_count == 2
+        await tool_executor.close()
+
+
+@pytest.mark.asyncio
+async def test_execute_tools_shares_one_session(tool_executor):
+    """Test a batch of calls runs over one session and keeps the call order."""
+    session = AsyncMock()
+
+    async def call_tool(name, arguments):
+        return SimpleNamespace(content=[SimpleNamespace(text=f'{{"path": "{arguments["file_path"]}"}}')])
+
+    session.call_tool.side_effect = call_tool
+
+    with patch("agent.tool_executor.aconnect_sse") as mock_sse, \
+         patch("agent.tool_executor.ClientSession") as mock_session:
+        mock_sse.return_value.__aenter__.return_value = (MagicMock(), MagicMock())
+        mock_session.return_value.__aenter__.return_value = session
+
+        results = await tool_executor.execute_tools(
+            [("read_file", {"file_path": f"{i}.txt"}) for i in range(5)]
+        )
+
+        assert [r["result"]["path"] for r in results] == [f"{i}.txt" for i in range(5)]
+        assert mock_sse.call_count == 1
+        assert await tool_executor.execute_tools([]) == []
+        await tool_executor.close()
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_timeout_keeps_session():
+    """Test a call that outlives the timeout fails without dropping the session."""
+    executor = ToolExecutor("http://localhost:8000", timeout=0.01)
+    session = AsyncMock()
+
+    async def call_tool(name, arguments):
+        if name == "bash":
+            await asyncio.sleep(1)
+        return SimpleNamespace(content=[])
+
+    session.call_tool.side_effect = call_tool
+
+    with patch("agent.tool_executor.aconnect_sse") as mock_sse, \
+         patch("agent.tool_executor.ClientSession") as mock_session:
+        mock_sse.return_value.__aenter__.return_value = (MagicMock(), MagicMock())
+        mock_session.return_value.__aenter__.return_value = session
+
+        slow = await executor.execute_tool("bash", {"command": "sleep 9"})
+        fast = await executor.execute_tool("read_file", {"file_path": "a.txt"})
+
+        assert slow["success"] is False
+        assert "0.01s" in slow["error"]
+        assert fast["success"] is True
+        assert mock_sse.call_count == 1
+        await executor.close()
+
+
 @pytest.mark.asyncio
 async def test_execute_tool_error(tool_executor):
     """Test tool execution with error."""
@@ -79,11 +199,34 @@ async def test_list_tools_from_server(tool_executor):
         "tools": ["read_file", "write_file", "grep", "bash"]
     }
 
-    with patch.object(tool_executor.client, "get", return_value=mock_response):
+    with patch.object(tool_executor.client, "get", return_value=mock_response) as mock_get:
         tools = await tool_executor.list_tools()
 
         assert tools == ["read_file", "write_file", "grep", "bash"]
 
+        # Reused until the TTL passes or the cache is invalidated
+        assert await tool_executor.list_tools() == tools
+        assert mock_get.call_count == 1
+        tool_executor.invalidate_tools_cache()
+        await tool_executor.list_tools()
+        assert mock_get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_has_tool(tool_executor):
+    """Test has_tool uses the fallback names until the server has answered."""
+    assert tool_executor.has_tool("web_search") is True
+
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"tools": ["read_file"]}
+
+    with patch.object(tool_executor.client, "get", return_value=mock_response):
+        await tool_executor.list_tools()
+
+    assert tool_executor.has_tool("read_file") is True
+    assert tool_executor.has_tool("web_search") is False
+
 
 @pytest.mark.asyncio
 async def test_close(tool_executor):